@@ -0,0 +1,101 @@
+"""Сквозной замер: запрос, проверка, разбор и отправка уведомления.
+
+Запуск: python -m benchmarks.bench_pipeline [число студентов ...]
+"""
+import json
+import resource
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import homework
+from homework_bot.fakes import FakePracticum, FakeTelegram
+from homework_bot.transport import HttpClient, TelegramSender
+
+WORKERS = 32
+
+
+def percentile(values, share):
+    """Перцентиль share (от 0 до 1) по отсортированному списку."""
+    return values[int(share * (len(values) - 1))]
+
+
+def poll(token, http):
+    """Запрос к API, проверка ответа и формирование сообщения."""
+    started = time.perf_counter()
+    response = homework.get_tenant_api_answer(token, 0, http)
+    message = homework.parse_statuses(homework.check_response(response))
+    return time.perf_counter() - started, message
+
+
+def send(sender, chat_id, message):
+    """Отправка сообщения в Telegram."""
+    started = time.perf_counter()
+    assert homework.send_message_to_chat(sender, chat_id, message)
+    return time.perf_counter() - started
+
+
+def timed_phase(func, jobs):
+    """Выполняет задачи в пуле и возвращает (секунды, результаты)."""
+    started = time.perf_counter()
+    with ThreadPoolExecutor(WORKERS) as executor:
+        results = list(executor.map(lambda job: func(*job), jobs))
+    return time.perf_counter() - started, results
+
+
+def summary(name, tenants, elapsed, latencies):
+    """Сводка по одной фазе в машиночитаемом виде."""
+    latencies = sorted(latencies)
+    return {
+        'benchmark': 'pipeline', 'phase': name, 'tenants': tenants,
+        'per_second': round(len(latencies) / elapsed, 1),
+        'p50_ms': round(percentile(latencies, 0.5) * 1000, 3),
+        'p99_ms': round(percentile(latencies, 0.99) * 1000, 3),
+        'max_rss_kb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+    }
+
+
+def run_once(tenants, api_url, telegram_url):
+    """Прогон конвейера для заданного числа студентов."""
+    http = HttpClient(pool_size=WORKERS)
+    sender = TelegramSender('0:bench', http, api_url=telegram_url)
+    endpoint = homework.ENDPOINT
+    homework.ENDPOINT = api_url
+    try:
+        tokens = [f'token{number}' for number in range(tenants)]
+        poll_time, polled = timed_phase(
+            poll, [(token, http) for token in tokens]
+        )
+        send_time, send_latencies = timed_phase(send, [
+            (sender, str(number), message)
+            for number, (_, message) in enumerate(polled)
+        ])
+    finally:
+        homework.ENDPOINT = endpoint
+        http.close()
+    return [
+        summary('poll', tenants, poll_time, [item[0] for item in polled]),
+        summary('send', tenants, send_time, send_latencies),
+    ]
+
+
+def run(tenant_counts=(1, 100, 10_000)):
+    """Замеры для каждого числа студентов."""
+    level = homework.logger.level
+    homework.logger.setLevel('WARNING')
+    try:
+        with FakePracticum() as practicum, FakeTelegram() as telegram:
+            results = []
+            for tenants in tenant_counts:
+                results.extend(
+                    run_once(tenants, practicum.url, telegram.url)
+                )
+            return results
+    finally:
+        homework.logger.setLevel(level)
+
+
+if __name__ == '__main__':
+    counts = [int(arg) for arg in sys.argv[1:]] or (1, 100, 10_000)
+    for result in run(counts):
+        print(json.dumps(result))
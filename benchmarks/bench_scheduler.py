@@ -0,0 +1,132 @@
+"""Очередь сроков на куче против обхода всех студентов на каждом тике.
+
+Запуск: python -m benchmarks.bench_scheduler [число студентов ...]
+"""
+import asyncio
+import json
+import random
+import sys
+import time
+
+from homework_bot.engine import PollingEngine, Tenant
+from homework_bot.scheduler import DueQueue
+
+PERIOD = 600
+# Сколько секунд расписания прогоняется в замере.
+SIMULATED = 60
+# Период опроса в замере настоящего диспетчера движка.
+DISPATCH_PERIOD = 2
+DISPATCH_CYCLES = 2
+
+
+def make_dues(count, seed=1):
+    """Сроки первых опросов, распределённые по периоду."""
+    rng = random.Random(seed)
+    return {f'token{number}': rng.uniform(0, PERIOD) for number in range(count)}
+
+
+def heap_path(dues, until=SIMULATED):
+    """Диспетчер просыпается к самому раннему сроку и берёт только его."""
+    queue = DueQueue()
+    for key, due in dues.items():
+        queue.schedule(key, due)
+    wakeups = polls = 0
+    due = queue.next_due()
+    while due is not None and due < until:
+        wakeups += 1
+        for key in queue.pop_due(due):
+            polls += 1
+            queue.schedule(key, due + PERIOD)
+        due = queue.next_due()
+    return wakeups, polls
+
+
+def scan_path(dues, until=SIMULATED):
+    """Раз в секунду обходит всех студентов и ищет наступившие сроки."""
+    dues = dict(dues)
+    wakeups = polls = 0
+    for now in range(1, until + 1):
+        wakeups += 1
+        for key, due in dues.items():
+            if due <= now:
+                polls += 1
+                dues[key] = due + PERIOD
+    return wakeups, polls
+
+
+def reschedule_cost(dues, repeat=100_000):
+    """Среднее время переноса срока одного студента в микросекундах."""
+    queue = DueQueue()
+    for key, due in dues.items():
+        queue.schedule(key, due)
+    keys = list(dues)
+    rng = random.Random(2)
+    picked = [rng.choice(keys) for _ in range(repeat)]
+    started = time.perf_counter()
+    for key in picked:
+        queue.schedule(key, rng.uniform(0, PERIOD))
+    return (time.perf_counter() - started) / repeat * 1e6
+
+
+def dispatch_path(count, period=DISPATCH_PERIOD, cycles=DISPATCH_CYCLES):
+    """Диспетчер PollingEngine с заглушкой вместо запроса к API.
+
+    Заглушка отвечает «ответ не изменился», поэтому замер включает
+    очередь сроков, пул потоков и ожидания диспетчера, но не сеть.
+    Пробуждения -- проходы цикла диспетчера.
+    """
+    engine = PollingEngine(
+        [Tenant(f'token{number}', str(number)) for number in range(count)],
+        bot=None, period=period, http=object()
+    )
+    engine.cache.fetch = lambda token, timestamp, session: (None, False)
+    wakeups = 0
+    pop_due = engine.due.pop_due
+
+    def counting_pop_due(now):
+        nonlocal wakeups
+        wakeups += 1
+        return pop_due(now)
+
+    engine.due.pop_due = counting_pop_due
+    asyncio.run(engine.run(cycles=cycles))
+    return wakeups, count * cycles
+
+
+def run(counts=(1_000, 100_000)):
+    """Замеряет оба способа на расписаниях разного размера."""
+    results = []
+    for count in counts:
+        dues = make_dues(count)
+        for name, func in (('heap', heap_path), ('scan', scan_path)):
+            started = time.perf_counter()
+            wakeups, polls = func(dues)
+            elapsed = time.perf_counter() - started
+            results.append({
+                'benchmark': 'schedule', 'mode': name, 'tenants': count,
+                'seconds': round(elapsed, 5), 'wakeups': wakeups,
+                'polls': polls,
+                'overhead_us_per_poll': round(elapsed / max(polls, 1) * 1e6, 2),
+            })
+        results.append({
+            'benchmark': 'schedule', 'mode': 'reschedule', 'tenants': count,
+            'microseconds': round(reschedule_cost(dues), 3),
+        })
+        started = time.perf_counter()
+        cpu = time.process_time()
+        wakeups, polls = dispatch_path(count)
+        cpu = time.process_time() - cpu
+        results.append({
+            'benchmark': 'schedule', 'mode': 'dispatch', 'tenants': count,
+            'seconds': round(time.perf_counter() - started, 3),
+            'cpu_seconds': round(cpu, 3), 'wakeups': wakeups,
+            'polls': polls,
+            'cpu_us_per_poll': round(cpu / max(polls, 1) * 1e6, 2),
+        })
+    return results
+
+
+if __name__ == '__main__':
+    counts = [int(arg) for arg in sys.argv[1:]] or (1_000, 100_000)
+    for result in run(counts):
+        print(json.dumps(result))
@@ -0,0 +1,101 @@
+"""Время холодного импорта модулей бота по данным python -X importtime.
+
+Запуск: python -m benchmarks.bench_startup [--budget-ms 60] [модуль ...]
+
+Код возврата 1, если медиана времени импорта превысила бюджет.
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+STARTUP_RUNS = 5
+# Бюджет на импорт модуля бота в миллисекундах.
+STARTUP_BUDGET_MS = float(os.getenv('STARTUP_BUDGET_MS', 60))
+# Модули, которые не должны загружаться при импорте homework.
+HEAVY_MODULES = ('telegram', 'requests', 'charset_normalizer', 'http.server')
+
+
+def parse_importtime(output):
+    """Строки stderr importtime: [(вложенность, модуль, мкс с зависимостями)].
+
+    Зависимости печатаются раньше модуля, который их импортировал.
+    """
+    entries = []
+    for line in output.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        if not cumulative.strip().isdigit():
+            continue
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        entries.append((depth, name.strip(), int(cumulative)))
+    return entries
+
+
+def import_once(module):
+    """Импортирует модуль в новом процессе; возвращает разбор importtime."""
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        cwd=ROOT, capture_output=True, text=True, check=True
+    )
+    return parse_importtime(result.stderr)
+
+
+def direct_imports(entries, module):
+    """Время импорта модуля и его прямых зависимостей."""
+    children = []
+    for depth, name, cumulative in entries:
+        if depth == 0 and name == module:
+            return cumulative, children
+        if depth == 0:
+            children = []
+        elif depth == 1:
+            children.append((name, cumulative))
+    raise ValueError(f"Модуль {module} не найден в выводе importtime.")
+
+
+def measure(module='homework', runs=STARTUP_RUNS):
+    """Медиана времени импорта и самые тяжёлые прямые зависимости."""
+    samples = [import_once(module) for _ in range(runs)]
+    timings = [direct_imports(entries, module)[0] for entries in samples]
+    _, children = direct_imports(samples[-1], module)
+    loaded = {name for _, name, _ in samples[-1]}
+    children.sort(key=lambda child: child[1], reverse=True)
+    return {
+        'benchmark': 'startup', 'mode': module,
+        'import_ms': round(statistics.median(timings) / 1000, 2),
+        'heavy_modules': [name for name in HEAVY_MODULES if name in loaded],
+        'top_imports': [
+            f'{name}: {microseconds / 1000:.1f} ms'
+            for name, microseconds in children[:5]
+        ],
+    }
+
+
+def run(modules=('homework', 'homework_bot.engine')):
+    """Замеряет импорт каждого модуля."""
+    return [measure(module) for module in modules]
+
+
+def main(argv=None):
+    """Печатает замеры и проверяет бюджет."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('modules', nargs='*', default=['homework'])
+    parser.add_argument('--budget-ms', type=float, default=STARTUP_BUDGET_MS)
+    args = parser.parse_args(argv)
+    over_budget = False
+    for result in run(args.modules):
+        print(f"{result['mode']}: {result['import_ms']} ms")
+        for line in result['top_imports']:
+            print(f'  {line}')
+        if result['import_ms'] > args.budget_ms:
+            over_budget = True
+            print(f"  превышен бюджет {args.budget_ms} ms")
+    return 1 if over_budget else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,94 @@
+"""Сравнение пиковой памяти: json.loads против потокового разбора.
+
+Запуск: python -m benchmarks.bench_streaming [число работ]
+"""
+import json
+import sys
+import time
+import tracemalloc
+
+import homework
+from homework_bot.streaming import check_homeworks, stream_homeworks
+
+CHUNK_SIZE = 64 * 1024
+
+
+def generate_body(count):
+    """Генерирует тело ответа API кусками, не собирая его целиком."""
+    yield b'{"homeworks": ['
+    for number in range(count):
+        item = {
+            'id': number,
+            'homework_name': f'student_hw_{number}.zip',
+            'status': 'approved',
+            'reviewer_comment': 'Всё отлично! ' * 4,
+            'date_updated': '2024-01-01T00:00:00Z',
+            'lesson_name': 'Проект спринта',
+        }
+        prefix = b',' if number else b''
+        yield prefix + json.dumps(item, ensure_ascii=False).encode()
+    yield b'], "current_date": 1700000000}'
+
+
+def rechunk(pieces, size=CHUNK_SIZE):
+    """Склеивает куски генератора в блоки размером как у iter_content."""
+    buffer = b''
+    for piece in pieces:
+        buffer += piece
+        while len(buffer) >= size:
+            yield buffer[:size]
+            buffer = buffer[size:]
+    if buffer:
+        yield buffer
+
+
+def full_decoding(count):
+    """Текущий путь: всё тело в памяти, затем json.loads."""
+    body = b''.join(generate_body(count))
+    answer = json.loads(body)
+    return sum(
+        1 for item in homework.check_response(answer)
+        if homework.parse_status(item)
+    )
+
+
+def streaming_decoding(count):
+    """Потоковый путь: работы разбираются и проверяются по мере чтения."""
+    return sum(
+        1 for item in check_homeworks(
+            stream_homeworks(rechunk(generate_body(count)), {})
+        )
+        if homework.parse_status(item)
+    )
+
+
+def measure(func, count):
+    """Возвращает (секунды, пик памяти в байтах) для одного прогона."""
+    tracemalloc.start()
+    started = time.perf_counter()
+    assert func(count) == count
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def run(counts=(1_000, 10_000, 100_000)):
+    """Замеряет оба способа для ответов разного размера."""
+    results = []
+    for count in counts:
+        for name, func in (
+            ('json.loads', full_decoding), ('streaming', streaming_decoding)
+        ):
+            elapsed, peak = measure(func, count)
+            results.append({
+                'benchmark': 'decode', 'mode': name, 'homeworks': count,
+                'seconds': round(elapsed, 4), 'peak_bytes': peak,
+            })
+    return results
+
+
+if __name__ == '__main__':
+    counts = [int(arg) for arg in sys.argv[1:]] or (1_000, 10_000, 100_000)
+    for result in run(counts):
+        print(json.dumps(result))
@@ -0,0 +1,101 @@
+"""Проверка пачки работ: схема за один проход против исключений на элемент.
+
+Запуск: python -m benchmarks.bench_validation [число работ ...]
+"""
+import json
+import sys
+import time
+
+import homework
+
+INVALID_SHARE = 0.1
+
+
+def generate_items(count, invalid_share):
+    """Элементы homeworks, из которых invalid_share некорректны."""
+    every = int(1 / invalid_share) if invalid_share else 0
+    items = []
+    for number in range(count):
+        item = {
+            'id': number,
+            'homework_name': f'student_hw_{number}.zip',
+            'status': 'approved',
+            'date_updated': '2024-01-01T00:00:00Z',
+        }
+        if every and number % every == 0:
+            item['status'] = 'lost' if number % 2 else None
+        items.append(item)
+    return items
+
+
+def legacy_build_homework(item):
+    """Прежняя проверка элемента: первое нарушение -- исключение."""
+    if not isinstance(item, dict):
+        raise TypeError("Домашняя работа должна быть словарем.")
+    name = item.get('homework_name')
+    status = item.get('status')
+    if not name:
+        raise KeyError("Отсутствует ключ 'homework_name' в ответе API.")
+    if not status:
+        raise KeyError("Отсутствует статус домашней работы.")
+    try:
+        status = homework.HomeworkStatus(status)
+    except ValueError:
+        raise ValueError(f"Неожиданный статус домашней работы: {status}")
+    return homework.Homework(
+        item.get('id'), name, status, item.get('date_updated')
+    )
+
+
+def exceptions_path(items):
+    """Исключение на каждый элемент, перехватываемое по одному."""
+    records = []
+    errors = []
+    for index, item in enumerate(items):
+        try:
+            records.append(legacy_build_homework(item))
+        except (KeyError, TypeError, ValueError) as error:
+            errors.append((index, error))
+    return records, errors
+
+
+def batch_path(items):
+    """Проверка всей пачки схемой за один проход."""
+    return homework.HOMEWORK_VALIDATOR.validate(items)
+
+
+def measure(func, items, repeat=5):
+    """Лучшее время из repeat прогонов и результат последнего."""
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func(items)
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def run(counts=(1_000, 100_000), invalid_shares=(0, INVALID_SHARE)):
+    """Замеряет оба способа на пачках разного размера и качества."""
+    results = []
+    for count in counts:
+        for share in invalid_shares:
+            items = generate_items(count, share)
+            for name, func in (
+                ('exceptions', exceptions_path), ('batch', batch_path)
+            ):
+                elapsed, (records, errors) = measure(func, items)
+                results.append({
+                    'benchmark': 'validate', 'mode': name,
+                    'homeworks': count, 'invalid_share': share,
+                    'seconds': round(elapsed, 5),
+                    'per_second': round(count / elapsed),
+                    'valid': len(records), 'errors': len(errors),
+                })
+    return results
+
+
+if __name__ == '__main__':
+    counts = [int(arg) for arg in sys.argv[1:]] or (1_000, 100_000)
+    for result in run(counts):
+        print(json.dumps(result))
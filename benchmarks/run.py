@@ -0,0 +1,104 @@
+"""Запуск всех замеров и сравнение результатов между коммитами.
+
+python -m benchmarks.run --output bench.json
+python -m benchmarks.run --compare base.json bench.json
+"""
+import argparse
+import datetime
+import json
+import platform
+import subprocess
+import sys
+
+from benchmarks import (
+    bench_pipeline, bench_scheduler, bench_startup, bench_streaming,
+    bench_validation
+)
+
+# Поля, по которым результаты сопоставляются между прогонами.
+KEY_FIELDS = (
+    'benchmark', 'phase', 'mode', 'tenants', 'homeworks', 'invalid_share'
+)
+
+
+def current_commit():
+    """Хеш текущего коммита или None вне git-репозитория."""
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', 'HEAD'], capture_output=True, text=True,
+            check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def collect(tenant_counts):
+    """Выполняет все замеры и возвращает отчёт."""
+    return {
+        'commit': current_commit(),
+        'python': platform.python_version(),
+        'created': datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        'results': (
+            bench_pipeline.run(tenant_counts) + bench_streaming.run()
+            + bench_validation.run() + bench_startup.run()
+            + bench_scheduler.run()
+        ),
+    }
+
+
+def result_key(result):
+    return tuple(result.get(field) for field in KEY_FIELDS)
+
+
+def compare(base, head):
+    """Строки с относительным изменением каждой метрики."""
+    base_results = {result_key(result): result for result in base['results']}
+    lines = []
+    for result in head['results']:
+        previous = base_results.get(result_key(result))
+        if previous is None:
+            continue
+        name = ' '.join(
+            f'{field}={result[field]}' for field in KEY_FIELDS
+            if result.get(field) is not None
+        )
+        for metric, value in result.items():
+            if (
+                metric in KEY_FIELDS or not previous.get(metric)
+                or not isinstance(value, (int, float))
+            ):
+                continue
+            change = (value - previous[metric]) / previous[metric] * 100
+            lines.append(
+                f'{name} {metric}: {previous[metric]} -> {value} '
+                f'({change:+.1f}%)'
+            )
+    return lines
+
+
+def main(argv=None):
+    """Точка входа командной строки."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--tenants', type=int, nargs='+',
+                        default=[1, 100, 10_000])
+    parser.add_argument('--output', help='файл для отчёта в формате JSON')
+    parser.add_argument('--compare', nargs=2, metavar=('BASE', 'HEAD'),
+                        help='сравнить два сохранённых отчёта')
+    args = parser.parse_args(argv)
+    if args.compare:
+        reports = []
+        for path in args.compare:
+            with open(path, encoding='utf-8') as file:
+                reports.append(json.load(file))
+        print('\n'.join(compare(*reports)))
+        return
+    report = json.dumps(collect(args.tenants), indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as file:
+            file.write(report + '\n')
+    else:
+        sys.stdout.write(report + '\n')
+
+
+if __name__ == '__main__':
+    main()
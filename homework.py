@@ -2,24 +2,42 @@ import logging
 import os
 import sys
 import time
+from collections import namedtuple
+from enum import Enum
 from http import HTTPStatus
 
-import requests
-from charset_normalizer import from_path
 from dotenv import load_dotenv
-from telegram import Bot
-from telegram.error import TelegramError
+
+from homework_bot import metrics
+from homework_bot.breaker import BreakerRegistry, CircuitOpenError
+from homework_bot.dedup import DedupIndex
+from homework_bot.digest import ErrorDigest
+from homework_bot.logs import SAMPLED, configure_logging
+from homework_bot.validation import BatchValidator, Field
 
 load_dotenv()
-bot = Bot
 
 PRACTICUM_TOKEN = os.getenv('PRACTICUM_TOKEN')
 TELEGRAM_TOKEN = os.getenv('TELEGRAM_TOKEN')
 TELEGRAM_CHAT_ID = os.getenv('TELEGRAM_CHAT_ID')
 
 RETRY_PERIOD = 600
-ENDPOINT = 'https://practicum.yandex.ru/api/user_api/homework_statuses/'
+# Путь к базе SQLite с курсором и статусами; без него состояние не хранится.
+STATE_DB = os.getenv('STATE_DB')
+# Адреса API можно переопределить, например для локальных заглушек.
+ENDPOINT = os.getenv(
+    'PRACTICUM_ENDPOINT',
+    'https://practicum.yandex.ru/api/user_api/homework_statuses/'
+)
+TELEGRAM_API_URL = os.getenv('TELEGRAM_API_URL', 'https://api.telegram.org')
 HEADERS = {'Authorization': f'OAuth {PRACTICUM_TOKEN}'}
+# Таймауты (соединение, чтение) в секундах: зависший API не блокирует цикл.
+REQUEST_TIMEOUT = (
+    float(os.getenv('CONNECT_TIMEOUT', 5)),
+    float(os.getenv('READ_TIMEOUT', 30)),
+)
+# На сколько секунд from_date запроса отступает назад от курсора.
+CURSOR_OVERLAP = int(os.getenv('CURSOR_OVERLAP', 60))
 
 HOMEWORK_VERDICTS = {
     'approved': 'Работа проверена: ревьюеру всё понравилось. Ура!',
@@ -27,14 +45,41 @@ HOMEWORK_VERDICTS = {
     'rejected': 'Работа проверена: у ревьюера есть замечания.'
 }
 
-logger = logging.getLogger(__name__)
-logger.setLevel(logging.DEBUG)
 
-stream_handler = logging.StreamHandler(sys.stdout)
-stream_handler.setLevel(logging.DEBUG)
-formatter = logging.Formatter('%(asctime)s [%(levelname)s] %(message)s')
-stream_handler.setFormatter(formatter)
-logger.addHandler(stream_handler)
+class HomeworkStatus(Enum):
+    """Статусы проверки домашней работы."""
+
+    APPROVED = 'approved'
+    REVIEWING = 'reviewing'
+    REJECTED = 'rejected'
+
+
+# Шаблоны сообщений собираются один раз, а не при каждом разборе статуса.
+STATUS_MESSAGES = {
+    status: (
+        'Изменился статус проверки работы "{}". '
+        f'{HOMEWORK_VERDICTS[status.value]}'
+    )
+    for status in HomeworkStatus
+}
+
+Homework = namedtuple('Homework', ('id', 'name', 'status', 'date_updated'))
+# Схема элемента homeworks в ответе API: поля в порядке полей Homework.
+HOMEWORK_VALIDATOR = BatchValidator(Homework, (
+    Field('id'),
+    Field('homework_name', required=True),
+    Field(
+        'status', required=True,
+        choices={status.value: status for status in HomeworkStatus}
+    ),
+    Field('date_updated'),
+))
+
+# Выключатели запросов к API; сбоями считаются ошибки сети, 5xx и 429.
+api_breakers = BreakerRegistry()
+
+logger = logging.getLogger(__name__)
+configure_logging(logger, sys.stdout)
 
 
 def check_tokens():
@@ -56,37 +101,128 @@ def check_tokens():
 
 def send_message(bot, message):
     """Отправка сообщения в Telegram с возвратом булевого значения."""
+    return send_message_to_chat(bot, TELEGRAM_CHAT_ID, message)
+
+
+def send_message_to_chat(bot, chat_id, message):
+    """Отправка сообщения в указанный чат Telegram."""
+    from telegram.error import TelegramError
+
+    started = time.monotonic()
     try:
-        bot.send_message(TELEGRAM_CHAT_ID, message)
-        logger.debug(f"Бот отправил сообщение: {message}")
+        bot.send_message(chat_id, message)
+        metrics.SEND_LATENCY.observe(time.monotonic() - started)
+        logger.debug("Бот отправил сообщение: %s", message)
         return True  # Успешная отправка
     except TelegramError as error:
         logger.error(f"Ошибка при отправке сообщения в Telegram: {error}")
+        metrics.SEND_FAILURES.inc(type(error).__name__)
     except Exception as error:
         logger.exception(f"Неизвестная ошибка при отправке сообщения: {error}")
+        metrics.SEND_FAILURES.inc(type(error).__name__)
     return False  # Сбой при отправке
 
 
+def cursor_from_date(cursor):
+    """from_date запроса для курсора -- последнего принятого current_date.
+
+    Запас CURSOR_OVERLAP защищает от расхождения часов: работы,
+    изменённые незадолго до current_date, придут повторно и будут
+    отброшены индексом отправленных статусов.
+    """
+    return max(int(cursor) - CURSOR_OVERLAP, 0)
+
+
 def get_api_answer(timestamp):
     """Делает запрос к API и возвращает его ответ в формате Python."""
-    params = {'timestamp': timestamp, 'from_date': from_path}
+    return request_api_answer(HEADERS, timestamp)
+
+
+def get_tenant_api_answer(token, timestamp, session=None):
+    """Делает запрос к API от имени переданного токена Практикума."""
+    return request_api_answer(
+        {'Authorization': f'OAuth {token}'}, timestamp, session
+    )
+
+
+def request_api_answer(headers, timestamp, session=None):
+    """Запрос к API с заданными заголовками авторизации.
+
+    session -- HTTP-клиент с методом get (например, пул соединений);
+    по умолчанию используется модуль requests.
+    """
+    return parse_api_answer(send_api_request(headers, timestamp, session))
+
+
+def send_api_request(headers, timestamp, session=None, stream=False):
+    """Отправляет запрос к API и возвращает необработанный ответ.
+
+    При stream=True тело ответа не загружается сразу, а читается по частям.
+    Пока выключатель API разомкнут, запрос не отправляется и поднимается
+    CircuitOpenError.
+    """
+    import requests
+
+    breaker = api_breakers.get(ENDPOINT, headers.get('Authorization'))
+    breaker.before_call()
+    params = {'from_date': timestamp}
+    http = session or requests
+    started = time.monotonic()
     try:
-        response = requests.get(ENDPOINT, headers=HEADERS, params=params)
+        response = http.get(
+            ENDPOINT, headers=headers, params=params,
+            timeout=REQUEST_TIMEOUT, stream=stream
+        )
     except requests.RequestException as error:
+        metrics.API_LATENCY.observe(time.monotonic() - started, 'error')
+        breaker.record_failure()
         raise ConnectionError(f"Ошибка при запросе к API: {error}")
+    metrics.API_LATENCY.observe(
+        time.monotonic() - started, str(response.status_code)
+    )
+    if (
+        response.status_code >= HTTPStatus.INTERNAL_SERVER_ERROR
+        or response.status_code == HTTPStatus.TOO_MANY_REQUESTS
+    ):
+        breaker.record_failure()
+    else:
+        breaker.record_success()
+    return response
+
+
+def check_api_status(response):
+    """Проверяет, что API ответило кодом 200."""
     if response.status_code != HTTPStatus.OK:
         raise ValueError(
             "Ошибка API: код ответа -"
             f"{response.status_code}, ожидалось {HTTPStatus.OK}"
         )
+
+
+def parse_api_answer(response):
+    """Проверяет код ответа API и декодирует его тело из JSON."""
+    check_api_status(response)
     try:
         return response.json()
     except ValueError as error:
         raise ValueError(f"Ошибка декодирования ответа API в JSON: {error}")
 
 
-def check_response(response):
-    """Проверяет корректность ответа от API."""
+class CheckedHomeworks(list):
+    """Записи Homework из ответа API; errors -- [ItemError] пропущенных."""
+
+    def __init__(self, records=(), errors=()):
+        super().__init__(records)
+        self.errors = list(errors)
+
+
+@metrics.count_failures('check_response')
+def check_response_items(response):
+    """Проверяет ответ API за один проход: (записи Homework, ошибки).
+
+    Ошибки -- список ItemError с номером некорректного элемента списка
+    работ; такие элементы логируются и пропускаются.
+    """
     if not isinstance(response, dict):
         raise TypeError(
             "Ответ API должен быть словарем, но вместо этого"
@@ -100,50 +236,177 @@ def check_response(response):
             "Данные по домашним работам должны быть списком,"
             f"но вместо этого получен объект типа {type(homeworks).__name__}."
         )
-    return homeworks  # Возвращаем список домашних работ
+    records, errors = HOMEWORK_VALIDATOR.validate(homeworks)
+    log_invalid(errors)
+    return records, errors
+
+
+def check_response(response):
+    """Проверяет корректность ответа от API и возвращает записи Homework.
+
+    Некорректные элементы списка работ логируются и пропускаются,
+    остальные работы возвращаются; ошибки пропущенных доступны в
+    атрибуте errors результата.
+    """
+    return CheckedHomeworks(*check_response_items(response))
 
 
+def log_invalid(errors):
+    """Логирует работы [ItemError], не прошедшие проверку, и считает их."""
+    for index, error in errors:
+        logger.error(f"Пропущена домашняя работа №{index}: {error}")
+        metrics.VALIDATION_FAILURES.inc('homework', type(error).__name__)
+
+
+def raise_for_invalid(errors):
+    """Поднимает ошибку первой работы, не прошедшей проверку.
+
+    Так некорректные работы попадают в сводку об ошибках, как и
+    остальные сбои опроса.
+    """
+    if errors:
+        raise errors[0].error
+
+
+def build_homework(homework):
+    """Проверяет элемент ответа API и строит из него запись Homework."""
+    record, error = HOMEWORK_VALIDATOR.validate_item(homework)
+    if error is not None:
+        raise error
+    return record
+
+
+@metrics.count_failures('parse_status')
 def parse_status(homework):
     """Извлекает статус домашней работы и формирует сообщение для Telegram."""
-    homework_name = homework.get('homework_name')
-    status = homework.get('status')
+    if not isinstance(homework, Homework):
+        homework = build_homework(homework)
+    return STATUS_MESSAGES[homework.status].format(homework.name)
+
+
+def sort_homeworks(homeworks):
+    """Упорядочивает домашние работы по времени изменения статуса."""
+    return sorted(
+        homeworks, key=lambda homework: homework.date_updated or ''
+    )
+
+
+def parse_statuses(homeworks):
+    """Формирует одно сообщение по всем работам из ответа API."""
+    return '\n'.join(
+        parse_status(homework) for homework in sort_homeworks(homeworks)
+    )
+
+
+def open_state_store():
+    """Открывает хранилище состояния, если задан STATE_DB."""
+    if not STATE_DB:
+        return None
+    from homework_bot.storage import StateStore
+    return StateStore(STATE_DB)
+
+
+def load_state(store):
+    """Возвращает сохранённые курсор и последнюю ошибку."""
+    default = (int(time.time()), None)
+    if store is None:
+        return default
+    return store.load().get(PRACTICUM_TOKEN, default)
+
+
+def save_state(store, timestamp, last_message, homeworks=()):
+    """Сохраняет курсор, последнюю ошибку и статусы работ."""
+    if store is None:
+        return
+    try:
+        store.save(PRACTICUM_TOKEN, timestamp, last_message, homeworks)
+    except Exception as error:
+        logger.exception(f"Не удалось сохранить состояние бота: {error}")
+
+
+def response_cursor(response, timestamp, invalid=()):
+    """Курсор после обработанного ответа API.
+
+    Курсор сдвигается к current_date, только если все работы ответа
+    прошли проверку: иначе некорректные работы запрашиваются снова.
+    """
+    if invalid:
+        return timestamp
+    return response.get('current_date', timestamp)
+
 
-    if not homework_name:
-        raise KeyError("Отсутствует ключ 'homework_name' в ответе API.")
+def advance_cursor(store, response, timestamp, last_message, invalid=()):
+    """Курсор после ответа, в котором нет новых статусов.
 
-    if not status:
-        raise KeyError("Отсутствует статус домашней работы.")
+    Если в ответе только уже отправленные статусы (например, из запаса
+    CURSOR_OVERLAP), курсор сдвигается к current_date, чтобы они не
+    запрашивались снова. Пустой ответ и ответ с некорректными работами
+    курсор не меняют.
+    """
+    if not response.get('homeworks') or invalid:
+        return timestamp
+    timestamp = response_cursor(response, timestamp)
+    save_state(store, timestamp, last_message)
+    return timestamp
 
-    verdict = HOMEWORK_VERDICTS.get(status)
-    if not verdict:
-        raise ValueError(f"Неожиданный статус домашней работы: {status}")
 
-    return f'Изменился статус проверки работы "{homework_name}". {verdict}'
+def report_error(bot, errors, error):
+    """Учитывает ошибку и отправляет сводку, если пришло её время."""
+    digest = errors.record(TELEGRAM_CHAT_ID, error)
+    if digest is None:
+        return False
+    if send_message(bot, digest):
+        return True
+    errors.failed(TELEGRAM_CHAT_ID)
+    return False
 
 
 def main():
     """Основная логика работы бота."""
     check_tokens()
-    bot = Bot(token=TELEGRAM_TOKEN)
-    timestamp = int(time.time())
-    last_message = None
+    from telegram import Bot
+    bot = Bot(token=TELEGRAM_TOKEN, base_url=f'{TELEGRAM_API_URL}/bot')
+    store = open_state_store()
+    timestamp, last_message = load_state(store)
+    sent_statuses = DedupIndex(store=store)
+    errors = ErrorDigest()
+    if last_message:
+        errors.mark_reported(TELEGRAM_CHAT_ID)
     while True:
         try:
-            response = get_api_answer(timestamp)
-            homeworks = check_response(response)
+            response = get_api_answer(cursor_from_date(timestamp))
+            homeworks = check_response(response) or []
+            invalid = getattr(homeworks, 'errors', [])
+            homeworks = sent_statuses.filter_new(PRACTICUM_TOKEN, homeworks)
             if homeworks:
-                homework = homeworks[0]
-                message = parse_status(homework)
+                message = parse_statuses(homeworks)
                 if send_message(bot, message):
-                    timestamp = response.get('current_date', timestamp)
+                    timestamp = response_cursor(response, timestamp, invalid)
                     last_message = None
+                    sent_statuses.remember(PRACTICUM_TOKEN, homeworks)
+                    save_state(store, timestamp, last_message, homeworks)
             else:
-                logger.debug("Новых статусов для проверки домашних работ нет.")
+                logger.debug(
+                    "Новых статусов для проверки домашних работ нет.",
+                    extra=SAMPLED
+                )
+                timestamp = advance_cursor(
+                    store, response, timestamp, last_message, invalid
+                )
+            raise_for_invalid(invalid)
+        except CircuitOpenError as error:
+            logger.warning(f"Опрос пропущен: {error}")
         except Exception as error:
             message = f"Сбой в работе программы: {error}"
             logger.exception(message)
-            if last_message != message and send_message(bot, message):
+            if report_error(bot, errors, error):
                 last_message = message
+                save_state(store, timestamp, last_message)
+        else:
+            recovery = errors.resolve(TELEGRAM_CHAT_ID)
+            if recovery is not None and send_message(bot, recovery):
+                last_message = None
+                save_state(store, timestamp, last_message)
         finally:
             time.sleep(RETRY_PERIOD)
 
@@ -0,0 +1 @@
+"""Инфраструктура для обслуживания множества студентов одним процессом."""
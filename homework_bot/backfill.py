@@ -0,0 +1,194 @@
+"""Выгрузка всей истории домашних работ студентов в файлы.
+
+Запуск: python -m homework_bot.backfill [--output DIR]
+
+История каждого студента дописывается в DIR/<chat_id>.jsonl по одной
+работе в строке. После каждой пачки работ в DIR/<chat_id>.checkpoint.json
+запоминается, до какого места записан файл, поэтому прерванную
+выгрузку можно перезапустить той же командой.
+"""
+import argparse
+import itertools
+import json
+import os
+import re
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+import homework
+from homework import logger
+from homework_bot.engine import TENANTS_FILE, load_tenants
+from homework_bot.streaming import stream_api_answer
+from homework_bot.transport import HttpClient
+from homework_bot.validation import ItemError
+
+BACKFILL_DIR = os.getenv('BACKFILL_DIR', 'backfill')
+BACKFILL_CONCURRENCY = int(os.getenv('BACKFILL_CONCURRENCY', 8))
+# Сколько работ проверяется и записывается между контрольными точками.
+BACKFILL_BATCH = int(os.getenv('BACKFILL_BATCH', 500))
+
+START = {'offset': 0, 'done': False}
+
+
+def tenant_paths(output, tenant):
+    """Пути к файлу истории и к контрольной точке студента."""
+    name = os.path.join(output, re.sub(r'[^\w-]', '_', tenant.chat_id))
+    return f'{name}.jsonl', f'{name}.checkpoint.json'
+
+
+def load_checkpoint(path):
+    """Контрольная точка выгрузки или начальное состояние."""
+    try:
+        with open(path, encoding='utf-8') as file:
+            return {**START, **json.load(file)}
+    except FileNotFoundError:
+        return dict(START)
+
+
+def save_checkpoint(path, progress):
+    """Атомарно заменяет контрольную точку."""
+    temporary = f'{path}.tmp'
+    with open(temporary, 'w', encoding='utf-8') as file:
+        json.dump(progress, file)
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(temporary, path)
+
+
+def item_key(item):
+    """Ключ работы: по нему при возобновлении пропускаются записанные."""
+    return (
+        item.get('id'), item.get('homework_name'), item.get('date_updated')
+    )
+
+
+def written_keys(file):
+    """Ключи работ, уже записанных в файл истории."""
+    file.seek(0)
+    return {item_key(json.loads(line)) for line in file}
+
+
+def write_batch(file, numbered):
+    """Проверяет работы общей схемой и дописывает корректные как есть.
+
+    numbered -- пары (номер работы в ответе, работа). В файл попадает
+    исходный элемент ответа со всеми полями, а не только поля записи
+    Homework.
+    """
+    if not numbered:
+        return 0
+    numbers, items = zip(*numbered)
+    _, errors = homework.HOMEWORK_VALIDATOR.validate(items)
+    homework.log_invalid([
+        ItemError(numbers[index], error) for index, error in errors
+    ])
+    invalid = {index for index, _ in errors}
+    file.write(b''.join(
+        json.dumps(item, ensure_ascii=False).encode() + b'\n'
+        for index, item in enumerate(items) if index not in invalid
+    ))
+    return len(items) - len(invalid)
+
+
+def commit_progress(file, checkpoint, done=False):
+    """Сбрасывает файл на диск и сохраняет контрольную точку."""
+    file.flush()
+    os.fsync(file.fileno())
+    progress = {'offset': file.tell(), 'done': done}
+    save_checkpoint(checkpoint, progress)
+    return progress
+
+
+def backfill_tenant(
+        tenant, output=BACKFILL_DIR, session=None, batch_size=BACKFILL_BATCH
+):
+    """Выгружает историю студента; возвращает число новых записей.
+
+    Вся история запрашивается одним запросом с from_date=0, ответ
+    читается потоково, а после каждой пачки из batch_size работ
+    сохраняется контрольная точка: до какого места записан файл.
+    Прерванная выгрузка отбрасывает хвост файла после контрольной
+    точки, повторяет запрос и пропускает работы, уже записанные в файл,
+    по ключу item_key. Поэтому порядок работ в ответе может меняться
+    между запусками: работа с новым статусом получает новый
+    date_updated и записывается ещё раз как следующая запись истории.
+    """
+    path, checkpoint = tenant_paths(output, tenant)
+    progress = load_checkpoint(checkpoint)
+    if progress['done']:
+        return 0
+    written = 0
+    with open(path, 'a+b') as file:
+        file.truncate(progress['offset'])
+        seen = written_keys(file)
+        stream = (
+            (number, item) for number, item in enumerate(
+                stream_api_answer(tenant.token, 0, {}, session)
+            )
+            if not isinstance(item, dict) or item_key(item) not in seen
+        )
+        while True:
+            batch = list(itertools.islice(stream, batch_size))
+            written += write_batch(file, batch)
+            done = len(batch) < batch_size
+            commit_progress(file, checkpoint, done)
+            if done:
+                break
+            logger.debug(
+                "Чат %s: записано работ: %s.", tenant.chat_id, written
+            )
+    return written
+
+
+def run(tenants, output=BACKFILL_DIR, concurrency=BACKFILL_CONCURRENCY):
+    """Выгружает историю студентов параллельно.
+
+    Возвращает словарь chat_id -> число записанных работ или исключение,
+    прервавшее выгрузку этого студента.
+    """
+    os.makedirs(output, exist_ok=True)
+    http = HttpClient(pool_size=max(1, min(len(tenants), concurrency)))
+
+    def backfill(tenant):
+        try:
+            return backfill_tenant(tenant, output, http)
+        except Exception as error:
+            logger.exception(
+                f"Выгрузка истории чата {tenant.chat_id} прервана: {error}"
+            )
+            return error
+
+    try:
+        with ThreadPoolExecutor(max(1, concurrency)) as executor:
+            return {
+                tenant.chat_id: result for tenant, result in zip(
+                    tenants, executor.map(backfill, tenants)
+                )
+            }
+    finally:
+        http.close()
+
+
+def main(argv=None):
+    """Точка входа командной строки; код 1, если выгрузка не завершена."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--tenants', default=TENANTS_FILE)
+    parser.add_argument('--output', default=BACKFILL_DIR)
+    parser.add_argument(
+        '--concurrency', type=int, default=BACKFILL_CONCURRENCY
+    )
+    args = parser.parse_args(argv)
+    results = run(load_tenants(args.tenants), args.output, args.concurrency)
+    failed = [
+        chat_id for chat_id, result in results.items()
+        if isinstance(result, Exception)
+    ]
+    logger.info(
+        f"Выгрузка истории завершена для {len(results) - len(failed)} "
+        f"из {len(results)} студентов."
+    )
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,132 @@
+"""Автоматический выключатель запросов к API Практикума."""
+import os
+import threading
+import time
+
+from homework_bot import metrics
+
+# Сколько сбоев подряд размыкают цепь.
+BREAKER_FAILURES = int(os.getenv('BREAKER_FAILURES', 5))
+# Сколько секунд цепь разомкнута до пробных запросов.
+BREAKER_RESET = float(os.getenv('BREAKER_RESET', 60))
+# Сколько пробных запросов одновременно пропускает полуоткрытая цепь.
+BREAKER_PROBES = int(os.getenv('BREAKER_PROBES', 1))
+# 1 -- отдельный выключатель для каждого токена, а не только для адреса.
+BREAKER_PER_TOKEN = os.getenv('BREAKER_PER_TOKEN', '0') == '1'
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+BREAKER_TRANSITIONS = metrics.Counter(
+    'homework_api_breaker_transitions_total',
+    'Переходы выключателя API по новому состоянию.', ('state',)
+)
+BREAKER_STATES = metrics.Gauge(
+    'homework_api_breakers', 'Число выключателей API в каждом состоянии.',
+    ('state',)
+)
+
+
+class CircuitOpenError(ConnectionError):
+    """Запрос не отправлен: цепь разомкнута после серии сбоев API."""
+
+
+class CircuitBreaker:
+    """Выключатель с состояниями closed, open и half_open.
+
+    В состоянии closed запросы идут как обычно, failures сбоев подряд
+    размыкают цепь. В состоянии open запросы не отправляются, пока не
+    пройдёт reset_timeout секунд. Затем цепь полуоткрыта: проходят не
+    больше probes пробных запросов одновременно, успех замыкает цепь,
+    сбой снова размыкает её.
+    """
+
+    def __init__(
+            self, failures=BREAKER_FAILURES, reset_timeout=BREAKER_RESET,
+            probes=BREAKER_PROBES, clock=time.monotonic
+    ):
+        self.failures = failures
+        self.reset_timeout = reset_timeout
+        self.probes = probes
+        self.clock = clock
+        self.state = CLOSED
+        self._failures = 0
+        self._opened_at = 0
+        self._probes = 0
+        self._lock = threading.Lock()
+
+    def _set_state(self, state):
+        if state != self.state:
+            self.state = state
+            BREAKER_TRANSITIONS.inc(state)
+
+    def before_call(self):
+        """Разрешает запрос или поднимает CircuitOpenError."""
+        with self._lock:
+            if self.state == OPEN:
+                left = self._opened_at + self.reset_timeout - self.clock()
+                if left > 0:
+                    raise CircuitOpenError(
+                        "API недоступно после серии сбоев, запросы "
+                        f"приостановлены ещё на {left:.0f} с."
+                    )
+                self._set_state(HALF_OPEN)
+                self._probes = 0
+            if self.state == HALF_OPEN:
+                if self._probes >= self.probes:
+                    raise CircuitOpenError(
+                        "API недоступно, ожидается результат пробного "
+                        "запроса."
+                    )
+                self._probes += 1
+
+    def record_success(self):
+        """Учитывает успешный ответ API."""
+        with self._lock:
+            self._failures = 0
+            self._set_state(CLOSED)
+
+    def record_failure(self):
+        """Учитывает сбой запроса к API."""
+        with self._lock:
+            self._failures += 1
+            if self.state == HALF_OPEN or self._failures >= self.failures:
+                self._opened_at = self.clock()
+                self._set_state(OPEN)
+
+
+class BreakerRegistry:
+    """Выключатели по адресу API и, при per_token, по токену."""
+
+    def __init__(self, per_token=BREAKER_PER_TOKEN, **options):
+        self.per_token = per_token
+        self.options = options
+        self._breakers = {}
+        self._lock = threading.Lock()
+        for state in (CLOSED, OPEN, HALF_OPEN):
+            BREAKER_STATES.set_function(
+                lambda state=state: self.count(state), state
+            )
+
+    def get(self, endpoint, token=None):
+        """Выключатель для запроса к endpoint с токеном token."""
+        key = (endpoint, token) if self.per_token else endpoint
+        breaker = self._breakers.get(key)
+        if breaker is None:
+            with self._lock:
+                breaker = self._breakers.setdefault(
+                    key, CircuitBreaker(**self.options)
+                )
+        return breaker
+
+    def count(self, state):
+        """Число выключателей в состоянии state."""
+        return sum(
+            breaker.state == state for breaker in list(self._breakers.values())
+        )
+
+    def clear(self):
+        """Возвращает все выключатели в исходное состояние."""
+        with self._lock:
+            self._breakers.clear()
@@ -0,0 +1,128 @@
+"""Кеш ответов API домашки с условными запросами."""
+import hashlib
+import json
+import re
+from collections import OrderedDict
+from http import HTTPStatus
+
+import homework
+
+# Поле current_date в теле ответа. Оно новое в каждом ответе, поэтому
+# при сравнении тел не учитывается; экранированная кавычка означает,
+# что совпадение внутри строки, а не ключ.
+CURRENT_DATE = re.compile(rb'(?<!\\)"current_date"\s*:\s*(-?[0-9][0-9.eE+-]*)')
+
+
+def body_digest(content):
+    """Хеш тела ответа без current_date и значение current_date или None.
+
+    Ключ current_date верхнего уровня API присылает последним, поэтому
+    берётся последнее совпадение.
+    """
+    match = None
+    for match in CURRENT_DATE.finditer(content):
+        pass
+    current_date = None
+    if match is not None:
+        try:
+            current_date = json.loads(match.group(1))
+        except ValueError:
+            match = None
+    if match is not None:
+        content = content[:match.start()] + content[match.end():]
+    return hashlib.blake2b(content, digest_size=16).digest(), current_date
+
+
+class CacheEntry:
+    """Последний ответ API для одного токена."""
+
+    __slots__ = (
+        'from_date', 'etag', 'last_modified', 'digest', 'payload', 'processed'
+    )
+
+    def __init__(self, from_date):
+        self.from_date = from_date
+        self.etag = None
+        self.last_modified = None
+        self.digest = None
+        self.payload = None
+        self.processed = False
+
+
+class ResponseCache:
+    """Кеш ответов, ключ -- токен и from_date запроса.
+
+    Если сервер прислал ETag или Last-Modified, следующий запрос уходит
+    с If-None-Match/If-Modified-Since. Ответ 304 или тело, побайтно
+    совпадающее с уже обработанным везде, кроме current_date, помечаются
+    как неизменившиеся: такой ответ не нужно проверять и разбирать
+    повторно, а в ещё не обработанном ответе обновляется current_date,
+    чтобы курсор сдвигался к последнему значению. Число записей
+    ограничено max_entries, вытесняются давно не использованные.
+    """
+
+    def __init__(self, max_entries=1024):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _entry(self, token, from_date):
+        """Возвращает запись токена, сбрасывая её при смене from_date."""
+        entry = self._entries.get(token)
+        if entry is None or entry.from_date != from_date:
+            entry = CacheEntry(from_date)
+            self._entries[token] = entry
+            if len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        self._entries.move_to_end(token)
+        return entry
+
+    def fetch(self, token, from_date, session=None):
+        """Запрашивает API и возвращает пару (ответ, изменился ли он).
+
+        Для неизменившегося и уже обработанного ответа вместо данных
+        возвращается None.
+        """
+        entry = self._entry(token, from_date)
+        headers = {'Authorization': f'OAuth {token}'}
+        if entry.etag:
+            headers['If-None-Match'] = entry.etag
+        if entry.last_modified:
+            headers['If-Modified-Since'] = entry.last_modified
+        response = homework.send_api_request(headers, from_date, session)
+        if response.status_code == HTTPStatus.NOT_MODIFIED and entry.digest:
+            return self._unchanged(entry)
+        digest, current_date = body_digest(response.content)
+        if response.status_code == HTTPStatus.OK and digest == entry.digest:
+            if entry.payload is not None and current_date is not None:
+                entry.payload['current_date'] = current_date
+            result = self._unchanged(entry)
+        else:
+            payload = homework.parse_api_answer(response)
+            entry.digest = digest
+            entry.payload = payload
+            entry.processed = False
+            result = payload, True
+        entry.etag = response.headers.get('ETag')
+        entry.last_modified = response.headers.get('Last-Modified')
+        return result
+
+    def _unchanged(self, entry):
+        """Результат для ответа, совпавшего с закешированным."""
+        if entry.processed:
+            return None, False
+        return entry.payload, True
+
+    def mark_processed(self, token):
+        """Отмечает последний ответ токена как полностью обработанный."""
+        entry = self._entries.get(token)
+        if entry is not None:
+            entry.processed = True
+            # Обработанный ответ больше не нужен, хватает его хеша.
+            entry.payload = None
+
+    def invalidate(self, token):
+        """Забывает ответ токена, следующий запрос обработается заново."""
+        self._entries.pop(token, None)
@@ -0,0 +1,179 @@
+"""Команды /status и /history, которые бот обслуживает из своего кеша."""
+import asyncio
+import os
+from collections import OrderedDict, deque
+
+from telegram.error import RetryAfter
+
+import homework
+from homework import logger
+
+# 1 -- движок отвечает на команды студентов через getUpdates.
+BOT_COMMANDS = os.getenv('BOT_COMMANDS', '1') == '1'
+# Сколько секунд Telegram держит запрос getUpdates без новых сообщений.
+UPDATES_TIMEOUT = float(os.getenv('UPDATES_TIMEOUT', 30))
+UPDATES_RETRY = 5
+HISTORY_SIZE = int(os.getenv('HISTORY_SIZE', 20))
+
+HELP_MESSAGE = 'Доступные команды: /status, /history.'
+NO_STATUSES_MESSAGE = 'Статусов работ пока нет.'
+
+
+class _ChatStatuses:
+    __slots__ = ('latest', 'history')
+
+    def __init__(self, size):
+        self.latest = OrderedDict()
+        self.history = deque(maxlen=size)
+
+
+class StatusCache:
+    """Последние результаты parse_status для каждого чата.
+
+    Для чата хранится последний статус каждой работы и история
+    сообщений о статусах длиной history_size. Чатов не больше
+    max_chats: давно не обновлявшиеся вытесняются первыми.
+    """
+
+    def __init__(self, max_chats=1024, history_size=HISTORY_SIZE):
+        self.max_chats = max_chats
+        self.history_size = history_size
+        self._chats = OrderedDict()
+
+    def record(self, chat_id, homeworks, messages):
+        """Запоминает сообщения messages о статусах работ homeworks."""
+        chat = self._chats.pop(chat_id, None)
+        if chat is None:
+            chat = _ChatStatuses(self.history_size)
+        self._chats[chat_id] = chat
+        while len(self._chats) > self.max_chats:
+            self._chats.popitem(last=False)
+        for item, message in zip(homeworks, messages):
+            key = item.name if item.id is None else item.id
+            chat.latest.pop(key, None)
+            chat.latest[key] = message
+            chat.history.append(message)
+        while len(chat.latest) > self.history_size:
+            chat.latest.popitem(last=False)
+
+    def status(self, chat_id):
+        """Последний статус каждой работы чата."""
+        chat = self._chats.get(chat_id)
+        return list(chat.latest.values()) if chat else []
+
+    def history(self, chat_id):
+        """Сообщения о статусах чата от старых к новым."""
+        chat = self._chats.get(chat_id)
+        return list(chat.history) if chat else []
+
+
+def stored_records(rows):
+    """Записи Homework из строк StateStore.homeworks."""
+    return [
+        homework.Homework(
+            homework_id, name, homework.HomeworkStatus(status), date_updated
+        )
+        for homework_id, name, status, date_updated in rows
+    ]
+
+
+class StoredStatuses:
+    """Статусы чатов, которые опрашивают другие процессы.
+
+    Ответы строятся из общего StateStore: в нём есть только последний
+    статус каждой работы, поэтому /history совпадает с /status. tokens --
+    словарь chat_id -> токен Практикума. Без store ответы пустые.
+    """
+
+    def __init__(self, store, tokens):
+        self.store = store
+        self.tokens = {
+            str(chat_id): token for chat_id, token in tokens.items()
+        }
+
+    def status(self, chat_id):
+        """Последний статус каждой работы чата."""
+        if self.store is None:
+            return []
+        return [
+            homework.parse_status(record) for record in stored_records(
+                self.store.homeworks(self.tokens[chat_id])
+            )
+        ]
+
+    history = status
+
+
+class CommandHandler:
+    """Получает команды долгим опросом getUpdates и отвечает через outbox.
+
+    Ответы для чатов chats строятся из StatusCache, для чатов других
+    процессов -- из stored (StoredStatuses); к API домашки команды не
+    обращаются. getUpdates может опрашивать только один процесс на
+    токен бота, поэтому при нескольких процессах обработчик работает в
+    одном из них. Сообщения из незнакомых чатов пропускаются.
+    """
+
+    def __init__(
+            self, bot, statuses, outbox, chats, timeout=UPDATES_TIMEOUT,
+            stored=None
+    ):
+        self.bot = bot
+        self.statuses = statuses
+        self.outbox = outbox
+        self.chats = {str(chat_id) for chat_id in chats}
+        self.stored = stored
+        self.timeout = timeout
+        self.offset = None
+
+    def _source(self, chat_id):
+        """Откуда брать статусы чата или None для незнакомого чата."""
+        if chat_id in self.chats:
+            return self.statuses
+        if self.stored is not None and chat_id in self.stored.tokens:
+            return self.stored
+        return None
+
+    def reply(self, chat_id, text, statuses=None):
+        """Ответ на команду text или None, если это не команда."""
+        if not text.startswith('/'):
+            return None
+        statuses = statuses or self.statuses
+        command = text.split()[0].partition('@')[0]
+        if command == '/status':
+            lines = statuses.status(chat_id)
+        elif command == '/history':
+            lines = statuses.history(chat_id)
+        else:
+            return HELP_MESSAGE
+        return '\n'.join(lines) or NO_STATUSES_MESSAGE
+
+    def handle(self, update):
+        """Обрабатывает одно обновление Bot API."""
+        self.offset = update['update_id'] + 1
+        message = update.get('message') or {}
+        chat_id = str(message.get('chat', {}).get('id'))
+        statuses = self._source(chat_id)
+        if statuses is None:
+            return
+        answer = self.reply(chat_id, message.get('text') or '', statuses)
+        if answer is not None:
+            self.outbox.put(chat_id, answer)
+
+    async def run(self):
+        """Обрабатывает команды, пока задачу не отменят."""
+        loop = asyncio.get_running_loop()
+        while True:
+            try:
+                updates = await loop.run_in_executor(
+                    None, self.bot.get_updates, self.offset, self.timeout
+                )
+            except RetryAfter as error:
+                await asyncio.sleep(error.retry_after)
+                continue
+            except Exception as error:
+                logger.error(f"Не удалось получить команды из Telegram: {error}")
+                await asyncio.sleep(UPDATES_RETRY)
+                continue
+            for update in updates:
+                self.handle(update)
@@ -0,0 +1,78 @@
+"""Индекс уже отправленных статусов для подавления повторных уведомлений."""
+import os
+import time
+from collections import OrderedDict
+
+DEDUP_SIZE = int(os.getenv('DEDUP_SIZE', 100_000))
+DEDUP_TTL = int(os.getenv('DEDUP_TTL', 30 * 24 * 60 * 60))
+
+
+class DedupIndex:
+    """Множество отправленных (id, status, date_updated) с вытеснением.
+
+    В индексе хранятся только хеши ключей, поэтому каждая запись занимает
+    одинаковый объём памяти, а число записей не превышает max_size: при
+    переполнении вытесняются давно не встречавшиеся. Записи старше ttl
+    секунд считаются забытыми. Если передано хранилище store, статусы
+    студента подгружаются из него при первом обращении к его токену.
+    """
+
+    def __init__(self, max_size=DEDUP_SIZE, ttl=DEDUP_TTL, store=None):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.store = store
+        self._seen = OrderedDict()
+        self._loaded_tokens = set()
+
+    def __len__(self):
+        return len(self._seen)
+
+    @staticmethod
+    def _key(token, homework_id, status, date_updated):
+        return hash((token, homework_id, status, date_updated))
+
+    def _add(self, key, now):
+        self._seen[key] = now
+        self._seen.move_to_end(key)
+        if len(self._seen) > self.max_size:
+            self._seen.popitem(last=False)
+
+    def _load(self, token, now):
+        """Подгружает из хранилища статусы, уже известные для токена."""
+        if self.store is None or token in self._loaded_tokens:
+            return
+        self._loaded_tokens.add(token)
+        for homework_id, (status, date_updated) in (
+            self.store.last_statuses(token).items()
+        ):
+            self._add(self._key(token, homework_id, status, date_updated), now)
+
+    def _homework_key(self, token, homework):
+        return self._key(
+            token, homework.id, homework.status.value, homework.date_updated
+        )
+
+    def filter_new(self, token, homeworks, now=None):
+        """Возвращает работы, о статусе которых ещё не сообщали."""
+        now = time.time() if now is None else now
+        self._load(token, now)
+        new_homeworks = []
+        for homework in homeworks:
+            key = self._homework_key(token, homework)
+            seen_at = self._seen.get(key)
+            if seen_at is None or now - seen_at > self.ttl:
+                new_homeworks.append(homework)
+            else:
+                self._seen.move_to_end(key)
+        return new_homeworks
+
+    def remember(self, token, homeworks, now=None):
+        """Отмечает статусы работ как отправленные."""
+        now = time.time() if now is None else now
+        for homework in homeworks:
+            self._add(self._homework_key(token, homework), now)
+
+    def forget(self, token, homeworks):
+        """Убирает статусы работ из индекса, например после сбоя отправки."""
+        for homework in homeworks:
+            self._seen.pop(self._homework_key(token, homework), None)
@@ -0,0 +1,125 @@
+"""Сводки об ошибках по окнам времени вместо сообщения на каждый сбой."""
+import os
+import time
+from collections import OrderedDict
+
+# Не чаще одной сводки об ошибках в чат за столько секунд.
+ERROR_WINDOW = float(os.getenv('ERROR_WINDOW', 600))
+# Сколько секунд опросы должны идти без ошибок до сообщения о
+# восстановлении.
+RECOVERY_QUIET = float(os.getenv('RECOVERY_QUIET', ERROR_WINDOW))
+RECOVERY_MESSAGE = 'Работа бота восстановлена.'
+
+
+class _ErrorGroup:
+    __slots__ = ('count', 'first_seen', 'last_seen', 'last_text')
+
+    def __init__(self, now):
+        self.count = 0
+        self.first_seen = now
+        self.last_seen = now
+        self.last_text = ''
+
+
+class _ChatErrors:
+    __slots__ = ('groups', 'sent_at', 'reported', 'clear_since')
+
+    def __init__(self):
+        self.groups = OrderedDict()
+        self.sent_at = None
+        self.reported = False
+        self.clear_since = None
+
+
+def _clock_time(timestamp):
+    return time.strftime('%H:%M:%S', time.localtime(timestamp))
+
+
+def format_groups(groups):
+    """Строки сводки: тип ошибки, число, первое и последнее появление."""
+    return '\n'.join(
+        f'{name} x{group.count} '
+        f'({_clock_time(group.first_seen)}-{_clock_time(group.last_seen)}): '
+        f'{group.last_text}'
+        for name, group in groups.items()
+    )
+
+
+class ErrorDigest:
+    """Копит ошибки каждого чата и решает, когда о них сообщить.
+
+    Ошибки группируются по типу исключения. Сводка уходит не чаще раза
+    в window секунд, в том числе после восстановления: если API то
+    падает, то работает, чат не получает сообщение на каждый сбой.
+    О восстановлении чат узнаёт один раз, когда опросы идут без ошибок
+    не меньше quiet секунд.
+    """
+
+    def __init__(
+            self, window=ERROR_WINDOW, quiet=RECOVERY_QUIET, clock=time.time
+    ):
+        self.window = window
+        self.quiet = quiet
+        self.clock = clock
+        self._chats = {}
+
+    def record(self, chat_id, error, now=None):
+        """Учитывает ошибку; возвращает сводку, если пора её отправить."""
+        now = self.clock() if now is None else now
+        chat = self._chats.setdefault(chat_id, _ChatErrors())
+        chat.clear_since = None
+        name = type(error).__name__
+        group = chat.groups.get(name)
+        if group is None:
+            group = chat.groups[name] = _ErrorGroup(now)
+        group.count += 1
+        group.last_seen = now
+        group.last_text = str(error)
+        if chat.sent_at is not None and now - chat.sent_at < self.window:
+            return None
+        text = 'Сбой в работе программы:\n' + format_groups(chat.groups)
+        chat.groups.clear()
+        chat.sent_at = now
+        chat.reported = True
+        return text
+
+    def mark_reported(self, chat_id):
+        """Об ошибке уже сообщали, например до перезапуска бота."""
+        self._chats.setdefault(chat_id, _ChatErrors()).reported = True
+
+    def failed(self, chat_id):
+        """Сводка не доставлена: следующая ошибка вызовет новую сразу."""
+        chat = self._chats.get(chat_id)
+        if chat is not None:
+            chat.sent_at = None
+
+    def resolve(self, chat_id, now=None):
+        """Опрос прошёл без ошибок; текст о восстановлении или None.
+
+        Текст возвращается, когда об ошибках сообщали и с первого
+        успешного опроса прошло quiet секунд. В него попадают ошибки,
+        которые ещё не вошли ни в одну сводку. Время последней сводки
+        сохраняется, пока не истечёт окно.
+        """
+        chat = self._chats.get(chat_id)
+        if chat is None:
+            return None
+        now = self.clock() if now is None else now
+        if not chat.reported:
+            if chat.sent_at is None or now - chat.sent_at >= self.window:
+                del self._chats[chat_id]
+            return None
+        if chat.clear_since is None:
+            chat.clear_since = now
+        if now - chat.clear_since < self.quiet:
+            return None
+        text = RECOVERY_MESSAGE
+        if chat.groups:
+            text = (
+                f'{RECOVERY_MESSAGE} Ошибки с последней сводки:\n'
+                + format_groups(chat.groups)
+            )
+        chat.groups.clear()
+        chat.reported = False
+        chat.clear_since = None
+        return text
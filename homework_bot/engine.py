@@ -0,0 +1,455 @@
+"""Асинхронный движок опроса API домашки для множества студентов."""
+import asyncio
+import functools
+import json
+import os
+import signal
+import sys
+import time
+from collections import deque, namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+import homework
+from homework import logger
+from homework_bot import metrics
+from homework_bot.cache import ResponseCache
+from homework_bot.commands import (
+    BOT_COMMANDS, CommandHandler, StatusCache, StoredStatuses, stored_records
+)
+from homework_bot.dedup import DedupIndex
+from homework_bot.digest import ErrorDigest
+from homework_bot.logs import SAMPLED
+from homework_bot.outbox import GLOBAL_RATE, Outbox
+from homework_bot.scheduler import (
+    AdaptiveScheduler, DueQueue, FixedRateTimer, ScheduleState
+)
+from homework_bot.sharding import (
+    select_tenants, shard_from_env, shared_state_db
+)
+from homework_bot.transport import HttpClient, TelegramSender
+
+TENANTS_FILE = os.getenv('TENANTS_FILE', 'tenants.json')
+POLL_CONCURRENCY = int(os.getenv('POLL_CONCURRENCY', 64))
+
+Tenant = namedtuple('Tenant', ('token', 'chat_id'))
+
+
+class Delivery:
+    """Сообщение о статусах, ожидающее результата отправки.
+
+    current_date -- из ответа, по которому собрано сообщение; delivered
+    -- None, пока результат отправки неизвестен.
+    """
+
+    __slots__ = ('current_date', 'delivered')
+
+    def __init__(self, current_date):
+        self.current_date = current_date
+        self.delivered = None
+
+
+class TenantState:
+    """Изменяемое состояние опроса одного студента.
+
+    deliveries -- сообщения о статусах в порядке постановки в очередь;
+    курсор сдвигается только по доставленным сообщениям, перед которыми
+    не осталось неотправленных.
+    """
+
+    __slots__ = ('timestamp', 'last_error', 'schedule', 'deliveries')
+
+    def __init__(self, timestamp, last_error=None):
+        self.timestamp = timestamp
+        self.last_error = last_error
+        self.schedule = ScheduleState(timestamp)
+        self.deliveries = deque()
+
+
+def load_tenants(path):
+    """Загружает список студентов из JSON-файла."""
+    with open(path, encoding='utf-8') as file:
+        records = json.load(file)
+    return [
+        Tenant(str(record['practicum_token']), str(record['chat_id']))
+        for record in records
+    ]
+
+
+class PollingEngine:
+    """Опрашивает API для всех студентов с ограничением параллелизма.
+
+    Блокирующие запросы к API выполняются в пуле потоков, поэтому
+    медленный или падающий запрос одного студента занимает только свой
+    слот и не задерживает остальных. Неизменившиеся ответы отсекает кеш,
+    уже отправленные статусы -- индекс sent_statuses, интервал до
+    следующего опроса выбирает scheduler, сроки опросов хранит очередь
+    due. Сообщения уходят через очередь outbox, опрос не ждёт их
+    доставки: курсор сдвигается и сохраняется в store, когда сообщение
+    доставлено, или сразу, если в ответе только уже отправленные
+    статусы. Об ошибках чат узнаёт из сводок errors, а не из сообщения
+    на каждый сбой. С commands=True движок параллельно с опросом
+    отвечает на команды /status и /history из кеша statuses, а для
+    other_tenants, которых опрашивают другие процессы, -- из store.
+    """
+
+    def __init__(
+            self, tenants, bot, concurrency=POLL_CONCURRENCY,
+            period=homework.RETRY_PERIOD, http=None, scheduler=None,
+            store=None, outbox=None, commands=False, other_tenants=()
+    ):
+        self.tenants = list(tenants)
+        self.outbox = outbox or Outbox(bot)
+        self.http = http or HttpClient(
+            pool_size=max(1, min(len(self.tenants), concurrency))
+        )
+        self.cache = ResponseCache(max_entries=max(1, len(self.tenants)))
+        self.concurrency = concurrency
+        self.scheduler = scheduler or AdaptiveScheduler(base=period)
+        self.store = store
+        self.sent_statuses = DedupIndex(store=store)
+        saved = store.load() if store else {}
+        default = (int(time.time()), None)
+        self.states = {
+            tenant: TenantState(*saved.get(tenant.token, default))
+            for tenant in self.tenants
+        }
+        for tenant, state in self.states.items():
+            state.schedule.phase = self.scheduler.phase(tenant.token)
+        self.errors = ErrorDigest()
+        for tenant, state in self.states.items():
+            if state.last_error:
+                self.errors.mark_reported(tenant.chat_id)
+        self.statuses = StatusCache(max_chats=max(1, len(self.tenants)))
+        self.commands = CommandHandler(
+            bot, self.statuses, self.outbox,
+            [tenant.chat_id for tenant in self.tenants],
+            stored=StoredStatuses(store, {
+                tenant.chat_id: tenant.token for tenant in other_tenants
+            })
+        ) if commands else None
+        if self.commands is not None and store is not None:
+            self._restore_statuses()
+        self._semaphore = None
+        self._executor = None
+        self.due = DueQueue()
+        self._stopping = None
+        self._wakeup = None
+        self._sleep_until = None
+
+    def _restore_statuses(self):
+        """Заполняет кеш statuses сохранёнными в store статусами.
+
+        После перезапуска индекс sent_statuses берёт известные статусы
+        из store, поэтому опрос их уже не отправит и не запишет в кеш.
+        """
+        saved = self.store.all_homeworks()
+        for tenant in self.tenants:
+            records = stored_records(saved.get(tenant.token, ()))
+            if records:
+                self.statuses.record(tenant.chat_id, records, [
+                    homework.parse_status(record) for record in records
+                ])
+
+    async def _call(self, func, *args):
+        """Выполняет блокирующую функцию в пуле, соблюдая лимит."""
+        loop = asyncio.get_running_loop()
+        async with self._semaphore:
+            return await loop.run_in_executor(self._executor, func, *args)
+
+    async def _save(self, tenant, homeworks=()):
+        """Сохраняет состояние студента в хранилище, если оно задано."""
+        if self.store is None:
+            return
+        state = self.states[tenant]
+        try:
+            await self._call(
+                self.store.save, tenant.token, state.timestamp,
+                state.last_error, homeworks
+            )
+        except Exception as error:
+            logger.exception(
+                f"Не удалось сохранить состояние чата {tenant.chat_id}: "
+                f"{error}"
+            )
+
+    async def poll_tenant(self, tenant):
+        """Один цикл опроса студента: запрос, проверка и уведомление."""
+        state = self.states[tenant]
+        self.scheduler.record_call(state.schedule)
+        try:
+            await self._poll(tenant, state)
+        except homework.CircuitOpenError as error:
+            logger.debug(
+                "Опрос чата %s пропущен: %s", tenant.chat_id, error,
+                extra=SAMPLED
+            )
+        except Exception as error:
+            message = f"Сбой в работе программы: {error}"
+            logger.exception(f"Чат {tenant.chat_id}: {message}")
+            state.last_error = message
+            digest = self.errors.record(tenant.chat_id, error)
+            if digest is not None:
+                self.outbox.put(tenant.chat_id, digest, functools.partial(
+                    self._error_delivered, tenant
+                ))
+        else:
+            recovery = self.errors.resolve(tenant.chat_id)
+            if recovery is not None:
+                state.last_error = None
+                self.outbox.put(tenant.chat_id, recovery, functools.partial(
+                    self._error_delivered, tenant
+                ))
+
+    async def _poll(self, tenant, state):
+        """Запрос к API и постановка уведомления о новых статусах."""
+        response, changed = await self._call(
+            self.cache.fetch, tenant.token,
+            homework.cursor_from_date(state.timestamp), self.http
+        )
+        if not changed:
+            logger.debug(
+                "Ответ API для чата %s не изменился.", tenant.chat_id,
+                extra=SAMPLED
+            )
+            return
+        homeworks, invalid = homework.check_response_items(response)
+        homeworks = self.sent_statuses.filter_new(tenant.token, homeworks)
+        if homeworks:
+            homeworks = homework.sort_homeworks(homeworks)
+            messages = [homework.parse_status(item) for item in homeworks]
+            self.statuses.record(tenant.chat_id, homeworks, messages)
+            self.scheduler.record_status(
+                state.schedule, homeworks[-1].status.value
+            )
+            self.sent_statuses.remember(tenant.token, homeworks)
+            delivery = Delivery(homework.response_cursor(
+                response, state.timestamp, invalid
+            ))
+            state.deliveries.append(delivery)
+            self.outbox.put(
+                tenant.chat_id, '\n'.join(messages), functools.partial(
+                    self._statuses_delivered, tenant, homeworks, delivery
+                )
+            )
+        else:
+            logger.debug(
+                "Новых статусов для чата %s нет.", tenant.chat_id,
+                extra=SAMPLED
+            )
+            if (
+                response.get('homeworks') and not invalid
+                and not state.deliveries
+            ):
+                state.timestamp = max(
+                    state.timestamp,
+                    response.get('current_date', state.timestamp)
+                )
+                await self._save(tenant)
+        # Ответ с некорректными работами не отмечается обработанным:
+        # ошибка повторяется в сводке, пока работы не исправят.
+        homework.raise_for_invalid(invalid)
+        self.cache.mark_processed(tenant.token)
+
+    async def _statuses_delivered(
+            self, tenant, homeworks, delivery, delivered
+    ):
+        """Сдвигает курсор после доставки или готовит повторную отправку.
+
+        Курсор только растёт и доходит лишь до доставленных сообщений,
+        перед которыми нет ожидающих. Если сообщение не доставлено, его
+        статусы будут запрошены снова, поэтому более поздние сообщения,
+        собранные до сбоя, курсор уже не сдвигают.
+        """
+        state = self.states[tenant]
+        delivery.delivered = delivered
+        if not delivered:
+            self.sent_statuses.forget(tenant.token, homeworks)
+            self.cache.invalidate(tenant.token)
+            later = False
+            for other in state.deliveries:
+                if later:
+                    other.current_date = None
+                later = later or other is delivery
+        cursor = state.timestamp
+        while state.deliveries and state.deliveries[0].delivered is not None:
+            done = state.deliveries.popleft()
+            if done.delivered and done.current_date is not None:
+                cursor = max(cursor, done.current_date)
+        state.timestamp = cursor
+        if delivered:
+            state.last_error = None
+            await self._save(tenant, homeworks)
+
+    async def _error_delivered(self, tenant, delivered):
+        """Сохраняет состояние после сводки об ошибках или восстановлении."""
+        if delivered:
+            await self._save(tenant)
+        else:
+            self.errors.failed(tenant.chat_id)
+
+    async def _poll_due(self, tenant, timer, repeat):
+        """Опрос, срок которого наступил, и назначение следующего срока.
+
+        Срок отсчитывается от предыдущего срока, а не от конца опроса,
+        поэтому медленные запросы не сдвигают расписание.
+        """
+        loop = asyncio.get_running_loop()
+        await self.poll_tenant(tenant)
+        if repeat:
+            due_at = time.time() - (loop.time() - timer.due)
+            timer.advance(self.scheduler.next_poll_in(
+                self.states[tenant].schedule, now=due_at
+            ))
+            self.due.schedule(tenant, timer.due)
+
+    def _poll_finished(self, running, task):
+        """Убирает завершённый опрос и при необходимости будит диспетчер.
+
+        Диспетчер будится, только если новый срок раньше того, до
+        которого он спит, или если опросов больше не осталось.
+        """
+        running.discard(task)
+        due = self.due.next_due()
+        if due is None:
+            wake = not running
+        else:
+            wake = self._sleep_until is None or due < self._sleep_until
+        if wake:
+            self._wakeup.set()
+
+    async def _dispatch(self, cycles=None):
+        """Запускает опросы по сроку из очереди due.
+
+        Диспетчер спит до самого раннего срока и просыпается раньше,
+        только когда опрос назначил более ранний срок, опросы
+        закончились или движок останавливают. Первый
+        опрос каждого студента ждёт его слота в сетке периода, чтобы
+        после запуска студенты не опрашивались все разом.
+        """
+        loop = asyncio.get_running_loop()
+        timers = {}
+        polls = dict.fromkeys(self.tenants, 0)
+        for tenant in self.tenants:
+            timer = timers[tenant] = FixedRateTimer(clock=loop.time)
+            timer.advance(self.scheduler.first_poll_in(
+                self.states[tenant].schedule
+            ))
+            self.due.schedule(tenant, timer.due)
+        running = set()
+        while self.due or running:
+            due = self._sleep_until = self.due.next_due()
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(
+                    self._wakeup.wait(),
+                    None if due is None else max(due - loop.time(), 0)
+                )
+            except asyncio.TimeoutError:
+                pass
+            if self._stopping.is_set():
+                break
+            now = loop.time()
+            for tenant in self.due.pop_due(now):
+                metrics.SCHEDULER_LAG.observe(max(now - timers[tenant].due, 0))
+                polls[tenant] += 1
+                task = asyncio.create_task(self._poll_due(
+                    tenant, timers[tenant],
+                    cycles is None or polls[tenant] < cycles
+                ))
+                running.add(task)
+                task.add_done_callback(
+                    functools.partial(self._poll_finished, running)
+                )
+        await asyncio.gather(*running)
+
+    def stop(self):
+        """Прерывает ожидание опросов; run завершится после текущих."""
+        if self._stopping is not None:
+            self._stopping.set()
+            self._wakeup.set()
+
+    async def run(self, cycles=None):
+        """Запускает опрос всех студентов; cycles ограничивает число циклов."""
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+        self._stopping = asyncio.Event()
+        self._wakeup = asyncio.Event()
+        self.outbox.start()
+        commands = (
+            asyncio.create_task(self.commands.run()) if self.commands else None
+        )
+        with ThreadPoolExecutor(self.concurrency) as executor:
+            self._executor = executor
+            try:
+                await self._dispatch(cycles)
+            finally:
+                if commands is not None:
+                    commands.cancel()
+                    await asyncio.gather(commands, return_exceptions=True)
+                await self.outbox.close()
+
+
+async def serve(engine):
+    """Запускает движок до SIGTERM или SIGINT, затем дожидается опросов."""
+    loop = asyncio.get_running_loop()
+    for signum in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(signum, engine.stop)
+    await engine.run()
+
+
+def other_shard_tenants(everyone, tenants, store, environ=os.environ):
+    """Студенты других процессов, на чьи команды может ответить этот.
+
+    Их статусы берутся из store, поэтому без общей для всех процессов
+    базы ответы были бы пустыми: тогда такие чаты не обслуживаются, а
+    в лог пишется предупреждение.
+    """
+    own = set(tenants)
+    others = [tenant for tenant in everyone if tenant not in own]
+    if others and (store is None or not shared_state_db(environ)):
+        logger.warning(
+            f"Команды из чатов {len(others)} студентов других процессов "
+            "не обслуживаются: база STATE_DB не общая (STATE_DB_SHARED=1)."
+        )
+        return []
+    return others
+
+
+def main():
+    """Запуск движка для студентов из файла TENANTS_FILE."""
+    if not homework.TELEGRAM_TOKEN:
+        logger.critical(
+            "Отсутствует обязательная переменная окружения: TELEGRAM_TOKEN"
+        )
+        sys.exit(1)
+    if metrics.METRICS_PORT:
+        metrics.start_http_server()
+    index, count = shard_from_env()
+    everyone = load_tenants(TENANTS_FILE)
+    tenants = select_tenants(everyone, index, count)
+    logger.debug(
+        f"Процесс {index + 1} из {count}, загружено студентов: {len(tenants)}"
+    )
+    http = HttpClient(pool_size=max(1, min(len(tenants), POLL_CONCURRENCY)))
+    bot = TelegramSender(homework.TELEGRAM_TOKEN, http)
+    store = homework.open_state_store()
+    # getUpdates на один токен бота может опрашивать только один процесс,
+    # а лимит отправки Telegram общий для всех процессов.
+    commands = BOT_COMMANDS and index == 0
+    engine = PollingEngine(
+        tenants, bot, http=http, store=store,
+        outbox=Outbox(bot, global_rate=GLOBAL_RATE / count),
+        commands=commands,
+        other_tenants=other_shard_tenants(
+            everyone, tenants, store
+        ) if commands else ()
+    )
+    try:
+        asyncio.run(serve(engine))
+    finally:
+        http.close()
+        if store is not None:
+            store.close()
+
+
+if __name__ == '__main__':
+    main()
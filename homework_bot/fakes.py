@@ -0,0 +1,283 @@
+"""Локальные заглушки API Практикума и Telegram Bot API.
+
+Нужны для нагрузочных и хаос-тестов без доступа к сети. Бот
+направляется на них переменными окружения PRACTICUM_ENDPOINT
+и TELEGRAM_API_URL.
+
+python -m homework_bot.fakes practicum --port 8001 --latency 0.2
+python -m homework_bot.fakes telegram --port 8002 --limit-every 10
+"""
+import argparse
+import hashlib
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class FakeServer(ThreadingHTTPServer):
+    """HTTP-сервер заглушки, работающий в фоновом потоке.
+
+    Параметры поведения передаются именованными аргументами и доступны
+    обработчику как server.options. Используется как контекстный
+    менеджер: при выходе сервер останавливается.
+    """
+
+    daemon_threads = True
+    request_queue_size = 1024
+    defaults = {}
+
+    def __init__(self, handler, port=0, seed=None, **options):
+        super().__init__(('127.0.0.1', port), handler)
+        self.options = dict(self.defaults, **options)
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.requests = 0
+        self._thread = None
+
+    @property
+    def url(self):
+        return f'http://127.0.0.1:{self.server_port}'
+
+    def count_request(self):
+        """Увеличивает счётчик запросов и возвращает его значение."""
+        with self.lock:
+            self.requests += 1
+            return self.requests
+
+    def chance(self, rate):
+        """Случайное событие с вероятностью rate."""
+        with self.lock:
+            return self.random.random() < rate
+
+    def start(self):
+        """Запускает обработку запросов в фоновом потоке."""
+        self._thread = threading.Thread(
+            target=self.serve_forever, kwargs={'poll_interval': 0.01},
+            daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Останавливает сервер и освобождает порт."""
+        self.shutdown()
+        self.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+
+class _JsonHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def send_body(self, body, status=200, headers=()):
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in headers:
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def send_json(self, data, status=200, headers=()):
+        self.send_body(json.dumps(data).encode(), status, headers)
+
+    def log_message(self, *args):
+        pass
+
+
+class PracticumHandler(_JsonHandler):
+    """Эмулирует ENDPOINT: задержки, ошибки, битый JSON, большие ответы."""
+
+    def do_GET(self):
+        server = self.server
+        options = server.options
+        server.count_request()
+        if options['latency']:
+            time.sleep(options['latency'])
+        if server.chance(options['error_rate']):
+            self.send_json(
+                {'code': 'error', 'message': 'Заглушка вернула ошибку.'},
+                status=options['error_status']
+            )
+            return
+        if server.chance(options['malformed_rate']):
+            self.send_body(b'{"homeworks": [')
+            return
+        token = self.headers.get('Authorization', '').rpartition(' ')[2]
+        body = json.dumps({
+            'homeworks': [
+                {
+                    'id': number,
+                    'homework_name': f'{token}_{number}.zip',
+                    'status': options['status'],
+                    'reviewer_comment': options['comment'],
+                    'date_updated': '2024-01-01T00:00:00Z',
+                    'lesson_name': 'Проект спринта',
+                }
+                for number in range(options['homeworks'])
+            ],
+            'current_date': options['current_date'] or int(time.time()),
+        }, ensure_ascii=False).encode()
+        headers = []
+        if options['etag']:
+            etag = '"{}"'.format(hashlib.md5(body).hexdigest())
+            if self.headers.get('If-None-Match') == etag:
+                with server.lock:
+                    server.not_modified += 1
+                self.send_response(304)
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+                return
+            headers.append(('ETag', etag))
+        self.send_body(body, headers=headers)
+
+
+class TelegramHandler(_JsonHandler):
+    """Эмулирует sendMessage с ответами 429 и retry_after и getUpdates."""
+
+    def bad_request(self, description):
+        """Отвечает 400, как Bot API на некорректный запрос."""
+        self.send_json({
+            'ok': False, 'error_code': 400,
+            'description': f'Bad Request: {description}',
+        }, status=400)
+
+    def do_POST(self):
+        server = self.server
+        options = server.options
+        try:
+            payload = json.loads(
+                self.rfile.read(int(self.headers.get('Content-Length', 0)))
+            )
+        except ValueError:
+            payload = None
+        if not isinstance(payload, dict):
+            self.bad_request('request body must be a JSON object')
+            return
+        if self.path.endswith('/getUpdates'):
+            self.send_json({'ok': True, 'result': server.wait_updates(
+                payload.get('offset') or 0, payload.get('timeout') or 0
+            )})
+            return
+        if payload.get('chat_id') in (None, '') or not payload.get('text'):
+            self.bad_request('chat_id and text are required')
+            return
+        number = server.count_request()
+        if options['latency']:
+            time.sleep(options['latency'])
+        if options['limit_every'] and number % options['limit_every'] == 0:
+            self.send_json({
+                'ok': False, 'error_code': 429,
+                'description': 'Too Many Requests',
+                'parameters': {'retry_after': options['retry_after']},
+            }, status=429)
+            return
+        with server.lock:
+            server.messages.append((payload['chat_id'], payload['text']))
+        # Полное сообщение, как в Bot API: telegram.Bot разбирает его
+        # в Message и без date или chat считает отправку неудачной.
+        self.send_json({'ok': True, 'result': {
+            'message_id': number,
+            'date': int(time.time()),
+            'chat': {'id': payload['chat_id'], 'type': 'private'},
+            'text': payload['text'],
+        }})
+
+
+class FakePracticum(FakeServer):
+    """Заглушка API Практикума; url подходит для PRACTICUM_ENDPOINT."""
+
+    defaults = {
+        'latency': 0, 'error_rate': 0, 'error_status': 500,
+        'malformed_rate': 0, 'homeworks': 1, 'status': 'approved',
+        'comment': 'Принято!', 'current_date': None, 'etag': False,
+    }
+
+    def __init__(self, port=0, seed=None, **options):
+        super().__init__(PracticumHandler, port, seed, **options)
+        self.not_modified = 0
+
+    @property
+    def url(self):
+        return f'http://127.0.0.1:{self.server_port}/'
+
+
+class FakeTelegram(FakeServer):
+    """Заглушка Bot API; url подходит для TELEGRAM_API_URL."""
+
+    defaults = {'latency': 0, 'limit_every': 0, 'retry_after': 1}
+
+    def __init__(self, port=0, seed=None, **options):
+        super().__init__(TelegramHandler, port, seed, **options)
+        self.messages = []
+        self.updates = []
+        self._new_update = threading.Condition(self.lock)
+
+    def send_command(self, chat_id, text):
+        """Имитирует сообщение студента боту."""
+        with self._new_update:
+            update_id = len(self.updates) + 1
+            self.updates.append({
+                'update_id': update_id,
+                'message': {
+                    'message_id': update_id,
+                    'chat': {'id': chat_id},
+                    'text': text,
+                },
+            })
+            self._new_update.notify_all()
+
+    def wait_updates(self, offset, timeout):
+        """Обновления с update_id не меньше offset, как getUpdates."""
+        with self._new_update:
+            self._new_update.wait_for(
+                lambda: len(self.updates) >= max(offset, 1), timeout
+            )
+            return [
+                update for update in self.updates
+                if update['update_id'] >= offset
+            ]
+
+
+def main(argv=None):
+    """Запускает заглушку из командной строки."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('kind', choices=('practicum', 'telegram'))
+    parser.add_argument('--port', type=int, default=0)
+    parser.add_argument('--seed', type=int)
+    parser.add_argument('--latency', type=float, default=0)
+    parser.add_argument('--error-rate', type=float, default=0)
+    parser.add_argument('--error-status', type=int, default=500)
+    parser.add_argument('--malformed-rate', type=float, default=0)
+    parser.add_argument('--homeworks', type=int, default=1)
+    parser.add_argument('--etag', action='store_true')
+    parser.add_argument('--limit-every', type=int, default=0)
+    parser.add_argument('--retry-after', type=int, default=1)
+    args = parser.parse_args(argv)
+    if args.kind == 'practicum':
+        server = FakePracticum(
+            args.port, args.seed, latency=args.latency,
+            error_rate=args.error_rate, error_status=args.error_status,
+            malformed_rate=args.malformed_rate, homeworks=args.homeworks,
+            etag=args.etag
+        )
+    else:
+        server = FakeTelegram(
+            args.port, args.seed, latency=args.latency,
+            limit_every=args.limit_every, retry_after=args.retry_after
+        )
+    print(f'Заглушка {args.kind} слушает {server.url}', flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
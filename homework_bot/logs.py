@@ -0,0 +1,119 @@
+"""Настройка логирования: фоновая запись, JSON и прореживание."""
+import atexit
+import itertools
+import json
+import logging
+import os
+import queue
+import sys
+import threading
+
+LOG_LEVEL = os.getenv('LOG_LEVEL', 'DEBUG').upper()
+# 1 -- запись в поток вывода уходит в фоновый поток.
+LOG_QUEUE = os.getenv('LOG_QUEUE', '0') == '1'
+# text или json.
+LOG_FORMAT = os.getenv('LOG_FORMAT', 'text')
+# Из N помеченных записей уровня DEBUG в лог попадает одна.
+LOG_SAMPLE_DEBUG = int(os.getenv('LOG_SAMPLE_DEBUG', 1))
+TEXT_FORMAT = '%(asctime)s [%(levelname)s] %(message)s'
+
+# extra для частых однотипных записей, которые можно прореживать.
+SAMPLED = {'sampled': True}
+
+
+class JsonFormatter(logging.Formatter):
+    """Одна запись -- один JSON-объект в строке."""
+
+    def format(self, record):
+        data = {
+            'time': self.formatTime(record),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        if record.exc_info:
+            data['exception'] = self.formatException(record.exc_info)
+        return json.dumps(data, ensure_ascii=False)
+
+
+class SamplingFilter(logging.Filter):
+    """Пропускает каждую N-ю запись, помеченную extra=SAMPLED.
+
+    Частота задаётся отдельно для каждого уровня: {logging.DEBUG: 100}.
+    Непомеченные записи и уровни без частоты проходят все.
+    """
+
+    def __init__(self, rates):
+        super().__init__()
+        self.rates = {level: rate for level, rate in rates.items() if rate > 1}
+        self._counters = {level: itertools.count() for level in self.rates}
+        self._lock = threading.Lock()
+
+    def filter(self, record):
+        rate = self.rates.get(record.levelno)
+        if rate is None or not getattr(record, 'sampled', False):
+            return True
+        with self._lock:
+            return next(self._counters[record.levelno]) % rate == 0
+
+
+class LazyQueueHandler(logging.Handler):
+    """Кладёт запись в очередь без форматирования.
+
+    Стандартный QueueHandler собирает текст сообщения в вызывающем
+    потоке; здесь это делает обработчик слушателя в фоновом потоке.
+    Очередь живёт в том же процессе, поэтому запись не сериализуется.
+    """
+
+    def __init__(self, records):
+        super().__init__()
+        self.queue = records
+
+    def emit(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except Exception:
+            self.handleError(record)
+
+
+def stop_listener(listener):
+    """Дописывает оставшиеся в очереди записи, если слушатель работает."""
+    if listener._thread is not None:
+        listener.stop()
+
+
+def make_formatter(kind=LOG_FORMAT):
+    """Форматтер для вывода: text или json."""
+    if kind == 'json':
+        return JsonFormatter()
+    return logging.Formatter(TEXT_FORMAT)
+
+
+def configure_logging(
+        logger, stream=None, level=LOG_LEVEL, use_queue=LOG_QUEUE,
+        kind=LOG_FORMAT, sample_debug=LOG_SAMPLE_DEBUG
+):
+    """Подключает к логгеру вывод в stream; возвращает слушатель очереди.
+
+    Без очереди запись идёт напрямую через StreamHandler, как раньше.
+    С очередью вызывающий поток только кладёт запись в queue.Queue,
+    а форматирование и запись выполняет QueueListener.
+    """
+    logger.setLevel(level)
+    stream_handler = logging.StreamHandler(stream or sys.stdout)
+    stream_handler.setLevel(level)
+    stream_handler.setFormatter(make_formatter(kind))
+    sampling = SamplingFilter({logging.DEBUG: sample_debug})
+    if not use_queue:
+        stream_handler.addFilter(sampling)
+        logger.addHandler(stream_handler)
+        return None
+    from logging.handlers import QueueListener
+
+    queue_handler = LazyQueueHandler(queue.SimpleQueue())
+    queue_handler.addFilter(sampling)
+    listener = QueueListener(queue_handler.queue, stream_handler)
+    listener.start()
+    atexit.register(stop_listener, listener)
+    logger.addHandler(queue_handler)
+    return listener
@@ -0,0 +1,230 @@
+"""Метрики бота в текстовом формате Prometheus."""
+import functools
+import os
+import threading
+
+# Порт HTTP-сервера метрик; 0 -- сервер не запускается.
+METRICS_PORT = int(os.getenv('METRICS_PORT', 0))
+METRICS_HOST = os.getenv('METRICS_HOST', '127.0.0.1')
+LATENCY_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30
+)
+
+
+class Metric:
+    """Базовая метрика с набором меток."""
+
+    kind = None
+
+    def __init__(self, name, documentation, labels=(), registry=None):
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self._lock = threading.Lock()
+        self._values = {}
+        (REGISTRY if registry is None else registry).register(self)
+
+    def _label_text(self, values, extra=()):
+        pairs = list(zip(self.labels, values)) + list(extra)
+        if not pairs:
+            return ''
+        return '{' + ','.join(
+            '{}="{}"'.format(name, str(value).replace('"', '\\"'))
+            for name, value in pairs
+        ) + '}'
+
+    def samples(self):
+        """Строки со значениями метрики."""
+        with self._lock:
+            values = list(self._values.items())
+        return [
+            f'{self.name}{self._label_text(labels)} {value}'
+            for labels, value in values
+        ]
+
+    def render(self):
+        return '\n'.join([
+            f'# HELP {self.name} {self.documentation}',
+            f'# TYPE {self.name} {self.kind}',
+            *self.samples(),
+        ])
+
+
+class Counter(Metric):
+    """Монотонно растущий счётчик."""
+
+    kind = 'counter'
+
+    def inc(self, *labels, amount=1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def value(self, *labels):
+        return self._values.get(labels, 0)
+
+
+class Gauge(Metric):
+    """Текущее значение; может вычисляться функцией при каждом чтении."""
+
+    kind = 'gauge'
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._functions = {}
+
+    def set(self, value, *labels):
+        with self._lock:
+            self._values[labels] = value
+
+    def set_function(self, function, *labels):
+        """Значение будет читаться из function() в момент выгрузки."""
+        with self._lock:
+            self._functions[labels] = function
+
+    def value(self, *labels):
+        function = self._functions.get(labels)
+        return function() if function else self._values.get(labels, 0)
+
+    def samples(self):
+        with self._lock:
+            keys = set(self._values) | set(self._functions)
+        return [
+            f'{self.name}{self._label_text(labels)} {self.value(*labels)}'
+            for labels in keys
+        ]
+
+
+class Histogram(Metric):
+    """Распределение значений по корзинам, как в Prometheus."""
+
+    kind = 'histogram'
+
+    def __init__(self, *args, buckets=LATENCY_BUCKETS, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.buckets = tuple(buckets) + (float('inf'),)
+
+    def observe(self, value, *labels):
+        with self._lock:
+            counts, total = self._values.get(
+                labels, ([0] * len(self.buckets), 0)
+            )
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[index] += 1
+                    break
+            self._values[labels] = (counts, total + value)
+
+    def count(self, *labels):
+        counts, _ = self._values.get(labels, ((), 0))
+        return sum(counts)
+
+    def samples(self):
+        with self._lock:
+            values = [
+                (labels, list(counts), total)
+                for labels, (counts, total) in self._values.items()
+            ]
+        lines = []
+        for labels, counts, total in values:
+            cumulative = 0
+            for bound, count in zip(self.buckets, counts):
+                cumulative += count
+                le = '+Inf' if bound == float('inf') else bound
+                lines.append(
+                    f'{self.name}_bucket'
+                    f'{self._label_text(labels, [("le", le)])} {cumulative}'
+                )
+            label_text = self._label_text(labels)
+            lines.append(f'{self.name}_sum{label_text} {total}')
+            lines.append(f'{self.name}_count{label_text} {cumulative}')
+        return lines
+
+
+class Registry:
+    """Набор метрик, выгружаемых одним текстом."""
+
+    def __init__(self):
+        self._metrics = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+
+    def render(self):
+        """Все метрики в текстовом формате Prometheus."""
+        return '\n'.join(metric.render() for metric in self._metrics) + '\n'
+
+
+REGISTRY = Registry()
+
+API_LATENCY = Histogram(
+    'homework_api_request_seconds',
+    'Время запроса к API домашки по коду ответа.', ('code',)
+)
+VALIDATION_FAILURES = Counter(
+    'homework_validation_failures_total',
+    'Ошибки проверки и разбора ответа API по типу исключения.',
+    ('stage', 'error')
+)
+SEND_LATENCY = Histogram(
+    'telegram_send_seconds', 'Время отправки сообщения в Telegram.'
+)
+SEND_FAILURES = Counter(
+    'telegram_send_failures_total',
+    'Неудачные отправки в Telegram по типу исключения.', ('error',)
+)
+QUEUE_DEPTH = Gauge(
+    'homework_queue_depth', 'Число элементов в очередях бота.', ('queue',)
+)
+SCHEDULER_LAG = Histogram(
+    'homework_scheduler_lag_seconds',
+    'Опоздание фактического опроса относительно запланированного.'
+)
+MISSED_TICKS = Counter(
+    'homework_scheduler_missed_ticks_total',
+    'Опросы, пропущенные из-за того, что предыдущий не уложился в интервал.'
+)
+
+
+def count_failures(stage):
+    """Декоратор: считает исключения функции в VALIDATION_FAILURES."""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            try:
+                return func(*args, **kwargs)
+            except Exception as error:
+                VALIDATION_FAILURES.inc(stage, type(error).__name__)
+                raise
+        return wrapper
+    return decorator
+
+
+def start_http_server(
+        port=METRICS_PORT, host=METRICS_HOST, registry=REGISTRY
+):
+    """Запускает HTTP-сервер метрик по адресу /metrics в фоновом потоке.
+
+    http.server импортируется здесь, а не при импорте модуля: сервер
+    нужен только движку, а метрики пишет и однопользовательский бот.
+    """
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path != '/metrics':
+                self.send_error(404)
+                return
+            body = registry.render().encode()
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/plain; version=0.0.4')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
@@ -0,0 +1,244 @@
+"""Очередь исходящих сообщений Telegram с ограничением скорости."""
+import asyncio
+import os
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from telegram.error import BadRequest, NetworkError, RetryAfter, TelegramError
+
+from homework import logger
+from homework_bot import metrics
+
+# Лимиты Bot API: около 30 сообщений в секунду всего и 1 в секунду в чат.
+GLOBAL_RATE = float(os.getenv('TELEGRAM_GLOBAL_RATE', 30))
+CHAT_RATE = float(os.getenv('TELEGRAM_CHAT_RATE', 1))
+SEND_WORKERS = int(os.getenv('SEND_WORKERS', 8))
+SEND_ATTEMPTS = int(os.getenv('SEND_ATTEMPTS', 3))
+# Сколько ответов 429 подряд выдерживает сообщение, прежде чем считаться
+# недоставленным.
+RATE_LIMIT_ATTEMPTS = int(os.getenv('RATE_LIMIT_ATTEMPTS', 5))
+# Сколько записей о чатах держать, прежде чем чистить устаревшие.
+CHAT_SLOTS_LIMIT = 10_000
+
+
+class TokenBucket:
+    """Корзина токенов: rate токенов в секунду, не больше capacity."""
+
+    __slots__ = ('rate', 'capacity', 'tokens', 'updated')
+
+    def __init__(self, rate, capacity=None, now=None):
+        self.rate = rate
+        self.capacity = capacity or max(rate, 1)
+        self.tokens = self.capacity
+        self.updated = time.monotonic() if now is None else now
+
+    def _refill(self, now):
+        self.tokens = min(
+            self.capacity, self.tokens + (now - self.updated) * self.rate
+        )
+        self.updated = now
+
+    def delay(self, now=None):
+        """Через сколько секунд появится свободный токен."""
+        now = time.monotonic() if now is None else now
+        self._refill(now)
+        if self.tokens >= 1:
+            return 0
+        return (1 - self.tokens) / self.rate
+
+    def consume(self, now=None):
+        """Забирает один токен."""
+        self._refill(time.monotonic() if now is None else now)
+        self.tokens -= 1
+
+
+class OutgoingMessage:
+    """Сообщение в очереди отправки."""
+
+    __slots__ = ('chat_id', 'text', 'callback', 'attempts', 'limited')
+
+    def __init__(self, chat_id, text, callback=None):
+        self.chat_id = chat_id
+        self.text = text
+        self.callback = callback
+        self.attempts = 0
+        self.limited = 0
+
+
+class Outbox:
+    """Отправляет сообщения из очереди, соблюдая лимиты Telegram.
+
+    put не ждёт отправки: сообщение встаёт в очередь своего чата, а
+    workers обработчиков забирают из общей очереди чаты, готовые к
+    отправке, дождавшись токена в общей корзине и окна в корзине чата.
+    Сообщения одного чата уходят строго по порядку: в каждый момент
+    отправляется не больше одного, а повтор остаётся в голове очереди
+    чата. На ответ 429 все обработчики ставятся на паузу на retry_after
+    секунд, но не больше rate_limit_attempts раз для одного сообщения;
+    сетевые ошибки повторяются до attempts раз. По итогу вызывается
+    callback(delivered) -- корутина.
+    """
+
+    def __init__(
+            self, bot, global_rate=GLOBAL_RATE, chat_rate=CHAT_RATE,
+            workers=SEND_WORKERS, attempts=SEND_ATTEMPTS,
+            rate_limit_attempts=RATE_LIMIT_ATTEMPTS
+    ):
+        self.bot = bot
+        self.chat_interval = 1 / chat_rate
+        self.workers = workers
+        self.attempts = attempts
+        self.rate_limit_attempts = rate_limit_attempts
+        self._bucket = TokenBucket(global_rate)
+        self._chat_slots = {}
+        self._resume_at = 0
+        self._chats = {}
+        self._pending = 0
+        self._queue = None
+        self._tasks = []
+        self._executor = None
+
+    @property
+    def depth(self):
+        """Число сообщений, ожидающих отправки."""
+        return self._pending
+
+    def start(self):
+        """Запускает обработчики очереди в текущем цикле событий."""
+        self._queue = asyncio.Queue()
+        metrics.QUEUE_DEPTH.set_function(lambda: self.depth, 'outbox')
+        self._executor = ThreadPoolExecutor(self.workers)
+        self._tasks = [
+            asyncio.create_task(self._worker()) for _ in range(self.workers)
+        ]
+
+    async def close(self):
+        """Дожидается отправки очереди и останавливает обработчики."""
+        await self._queue.join()
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._executor.shutdown()
+
+    def put(self, chat_id, text, callback=None):
+        """Ставит сообщение в очередь, не дожидаясь отправки."""
+        message = OutgoingMessage(chat_id, text, callback)
+        self._pending += 1
+        chat = self._chats.get(chat_id)
+        if chat is not None:
+            chat.append(message)
+            return
+        self._chats[chat_id] = deque((message,))
+        self._queue.put_nowait(chat_id)
+
+    async def _wait_turn(self, chat_id):
+        """Ждёт, пока отправка в чат не нарушит ни один из лимитов."""
+        while True:
+            now = time.monotonic()
+            delay = max(
+                self._resume_at - now,
+                self._chat_slots.get(chat_id, 0) - now,
+                self._bucket.delay(now),
+            )
+            if delay <= 0:
+                self._bucket.consume(now)
+                self._reserve_chat(chat_id, now)
+                return
+            await asyncio.sleep(delay)
+
+    def _reserve_chat(self, chat_id, now):
+        """Запоминает, когда в чат можно будет написать снова."""
+        if len(self._chat_slots) >= CHAT_SLOTS_LIMIT:
+            self._chat_slots = {
+                chat: slot for chat, slot in self._chat_slots.items()
+                if slot > now
+            }
+        self._chat_slots[chat_id] = now + self.chat_interval
+
+    async def _worker(self):
+        while True:
+            chat_id = await self._queue.get()
+            try:
+                await self._send_next(chat_id)
+            finally:
+                self._queue.task_done()
+
+    async def _send_next(self, chat_id):
+        """Отправляет первое сообщение чата и возвращает чат в очередь."""
+        chat = self._chats[chat_id]
+        message = chat[0]
+        delivered, error = await self._attempt(message)
+        if delivered is None:
+            self._queue.put_nowait(chat_id)
+            return
+        chat.popleft()
+        self._pending -= 1
+        if chat:
+            self._queue.put_nowait(chat_id)
+        else:
+            del self._chats[chat_id]
+        if not delivered:
+            self._log_failure(error)
+        await self._finish(message, delivered)
+
+    async def _attempt(self, message):
+        """Одна попытка отправки: (доставлено, ошибка).
+
+        Вместо признака доставки возвращается None, если сообщение нужно
+        отправить ещё раз.
+        """
+        loop = asyncio.get_running_loop()
+        try:
+            await self._wait_turn(message.chat_id)
+            started = time.monotonic()
+            await loop.run_in_executor(
+                self._executor, self.bot.send_message,
+                message.chat_id, message.text
+            )
+        except RetryAfter as error:
+            logger.warning(
+                f"Telegram ограничил отправку на {error.retry_after} с."
+            )
+            metrics.SEND_FAILURES.inc(type(error).__name__)
+            self._resume_at = time.monotonic() + error.retry_after
+            message.limited += 1
+            if message.limited >= self.rate_limit_attempts:
+                return False, error
+            return None, error
+        except NetworkError as error:
+            metrics.SEND_FAILURES.inc(type(error).__name__)
+            message.attempts += 1
+            if (
+                isinstance(error, BadRequest)
+                or message.attempts >= self.attempts
+            ):
+                return False, error
+            logger.warning(f"Повторная отправка сообщения в Telegram: {error}")
+            return None, error
+        except Exception as error:
+            metrics.SEND_FAILURES.inc(type(error).__name__)
+            return False, error
+        metrics.SEND_LATENCY.observe(time.monotonic() - started)
+        logger.debug("Бот отправил сообщение: %s", message.text)
+        return True, None
+
+    @staticmethod
+    def _log_failure(error):
+        """Логирует окончательный сбой отправки."""
+        if isinstance(error, TelegramError):
+            logger.error(f"Ошибка при отправке сообщения в Telegram: {error}")
+        else:
+            logger.error(
+                f"Неизвестная ошибка при отправке сообщения: {error}",
+                exc_info=error
+            )
+
+    async def _finish(self, message, delivered):
+        """Сообщает отправителю результат доставки."""
+        if message.callback is None:
+            return
+        try:
+            await message.callback(delivered)
+        except Exception as error:
+            logger.exception(f"Ошибка обработки результата отправки: {error}")
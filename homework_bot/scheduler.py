@@ -0,0 +1,226 @@
+"""Планирование опросов API домашки."""
+import hashlib
+import heapq
+import itertools
+import math
+import os
+import random
+import time
+
+import homework
+from homework_bot import metrics
+
+# Пока работа на ревью, вердикт может появиться в любой момент.
+REVIEWING_PERIOD = int(os.getenv('REVIEWING_PERIOD', 120))
+# Сколько секунд без изменений опрашивать с обычным периодом.
+IDLE_AFTER = int(os.getenv('IDLE_AFTER', 6 * 60 * 60))
+# Потолок интервала при экспоненциальном откате.
+MAX_PERIOD = int(os.getenv('MAX_PERIOD', 60 * 60))
+# Лимит запросов к API на одного студента за окно BUDGET_WINDOW (0 -- нет).
+API_CALL_BUDGET = int(os.getenv('API_CALL_BUDGET', 0))
+BUDGET_WINDOW = int(os.getenv('BUDGET_WINDOW', 24 * 60 * 60))
+# Доля интервала, на которую опрос случайно откладывается.
+POLL_JITTER = float(os.getenv('POLL_JITTER', 0.05))
+
+
+class ScheduleState:
+    """История опросов одного студента, нужная для выбора интервала."""
+
+    __slots__ = ('status', 'changed_at', 'window_start', 'calls', 'phase')
+
+    def __init__(self, now=None, phase=0.0):
+        now = time.time() if now is None else now
+        self.phase = phase
+        self.status = None
+        self.changed_at = now
+        self.window_start = now
+        self.calls = 0
+
+
+class AdaptiveScheduler:
+    """Выбирает интервал до следующего опроса по состоянию домашки.
+
+    Пока работа на ревью, API опрашивается каждые reviewing секунд, чтобы
+    вердикт приходил не позже, чем при фиксированном периоде. Если статус
+    не меняется дольше idle_after секунд, интервал удваивается за каждые
+    следующие idle_after секунд простоя, но не превышает max_period.
+    Лимит budget запросов за окно window распределяет оставшиеся запросы
+    равномерно до конца окна.
+
+    Чтобы студенты не опрашивались в одну и ту же секунду, опросы
+    привязаны к сетке часов со сдвигом phase, который вычисляется из
+    токена: он не зависит от числа студентов и не меняется между
+    перезапусками. Сверху добавляется случайная задержка до jitter
+    от интервала.
+    """
+
+    def __init__(
+            self, base=homework.RETRY_PERIOD, reviewing=REVIEWING_PERIOD,
+            idle_after=IDLE_AFTER, max_period=MAX_PERIOD,
+            budget=API_CALL_BUDGET, window=BUDGET_WINDOW, jitter=POLL_JITTER,
+            seed=None
+    ):
+        self.base = base
+        self.reviewing = min(reviewing, base)
+        self.idle_after = idle_after
+        self.max_period = max(max_period, base)
+        self.budget = budget
+        self.window = window
+        self.jitter = jitter
+        self.random = random.Random(seed)
+
+    @staticmethod
+    def phase(token):
+        """Сдвиг студента в долях интервала, одинаковый во всех процессах."""
+        digest = hashlib.blake2b(token.encode(), digest_size=8).digest()
+        return int.from_bytes(digest, 'big') / 2 ** 64
+
+    def _jitter(self, period):
+        return self.random.uniform(0, self.jitter * period)
+
+    def first_poll_in(self, state, now=None):
+        """Секунды до первого опроса: ближайший слот студента в сетке base."""
+        if self.base <= 0:
+            return 0
+        now = time.time() if now is None else now
+        return (state.phase * self.base - now) % self.base + self._jitter(
+            self.base
+        )
+
+    def next_poll_in(self, state, now=None):
+        """Секунды до следующего опроса с учётом сдвига студента.
+
+        Интервал из next_delay выравнивается к ближайшему слоту сетки
+        с этим интервалом, поэтому накопившиеся задержки и прошлый
+        случайный сдвиг не уводят опрос из своего слота. Если ближайший
+        слот раньше, чем позволяет лимит budget, берётся первый слот
+        не раньше этого срока.
+        """
+        now = time.time() if now is None else now
+        period = self.next_delay(state, now)
+        if period <= 0:
+            return 0
+        offset = state.phase * period
+        slot = round((now + period - offset) / period) * period + offset
+        delay = max(slot - now, period / 2)
+        floor = self.budget_delay(state, now)
+        if delay < floor:
+            slot = math.ceil((now + floor - offset) / period) * period + offset
+            delay = max(slot - now, floor)
+        return delay + self._jitter(period)
+
+    def record_call(self, state, now=None):
+        """Учитывает запрос к API в лимите текущего окна."""
+        now = time.time() if now is None else now
+        if now - state.window_start >= self.window:
+            state.window_start = now
+            state.calls = 0
+        state.calls += 1
+
+    def record_status(self, state, status, now=None):
+        """Запоминает новый статус работы и время его изменения."""
+        state.status = status
+        state.changed_at = time.time() if now is None else now
+
+    def next_delay(self, state, now=None):
+        """Возвращает число секунд до следующего опроса."""
+        now = time.time() if now is None else now
+        idle = now - state.changed_at
+        if state.status == 'reviewing':
+            delay = self.reviewing
+        elif idle < self.idle_after:
+            delay = self.base
+        else:
+            doublings = min(int(idle // max(self.idle_after, 1)), 32)
+            delay = min(self.max_period, self.base * 2 ** doublings)
+        return max(delay, self.budget_delay(state, now), 0)
+
+    def budget_delay(self, state, now=None):
+        """Наименьшая задержка, при которой не превышается лимит budget.
+
+        Оставшиеся запросы распределяются равномерно до конца окна; если
+        они исчерпаны, следующий опрос ждёт нового окна.
+        """
+        if not self.budget:
+            return 0
+        now = time.time() if now is None else now
+        window_left = state.window_start + self.window - now
+        calls_left = self.budget - state.calls
+        if calls_left <= 0:
+            return window_left
+        return window_left / calls_left
+
+
+class FixedRateTimer:
+    """Срок следующего опроса по монотонным часам clock.
+
+    Срок отсчитывается от предыдущего срока, а не от конца работы,
+    поэтому длительность запроса не сдвигает расписание. Если работа
+    не уложилась в интервал, опоздавший опрос выполняется сразу, а
+    более ранние просроченные не копятся: они учитываются в missed.
+    """
+
+    def __init__(self, clock=time.monotonic):
+        self.clock = clock
+        self.due = None
+        self.missed = 0
+
+    def advance(self, delay):
+        """Назначает срок через delay секунд после прошлого; ждать до него."""
+        now = self.clock()
+        due = now + delay if self.due is None else self.due + delay
+        if delay > 0 and due < now:
+            missed = int((now - due) // delay)
+            due += missed * delay
+            if missed:
+                self.missed += missed
+                metrics.MISSED_TICKS.inc(amount=missed)
+        self.due = max(due, now) if delay <= 0 else due
+        return max(self.due - now, 0)
+
+
+class DueQueue:
+    """Ключи, упорядоченные по сроку, на двоичной куче.
+
+    Перенос срока ключа -- O(log N): старая запись в куче помечается
+    удалённой и выбрасывается, когда оказывается на вершине.
+    """
+
+    def __init__(self):
+        self._heap = []
+        self._entries = {}
+        self._order = itertools.count()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def schedule(self, key, due):
+        """Назначает ключу срок due, заменяя прежний."""
+        self.cancel(key)
+        entry = [due, next(self._order), key, True]
+        self._entries[key] = entry
+        heapq.heappush(self._heap, entry)
+
+    def cancel(self, key):
+        """Убирает ключ из очереди, если он там есть."""
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            entry[3] = False
+
+    def next_due(self):
+        """Самый ранний срок или None, если очередь пуста."""
+        heap = self._heap
+        while heap and not heap[0][3]:
+            heapq.heappop(heap)
+        return heap[0][0] if heap else None
+
+    def pop_due(self, now):
+        """Извлекает ключи со сроком не позже now в порядке сроков."""
+        heap = self._heap
+        keys = []
+        while heap and heap[0][0] <= now:
+            _, _, key, active = heapq.heappop(heap)
+            if active:
+                del self._entries[key]
+                keys.append(key)
+        return keys
@@ -0,0 +1,125 @@
+"""Распределение студентов между процессами движка.
+
+Каждый процесс опрашивает только своих студентов: владелец токена
+определяется консистентным хешированием, поэтому два процесса никогда
+не опрашивают один токен, а при изменении числа процессов N переезжает
+около 1/N студентов.
+
+python -m homework_bot.sharding --workers 4
+"""
+import argparse
+import bisect
+import hashlib
+import os
+import signal
+import subprocess
+import sys
+
+# Число виртуальных узлов на процесс: чем больше, тем ровнее доли.
+SHARD_REPLICAS = int(os.getenv('SHARD_REPLICAS', 128))
+
+
+def _hash(key):
+    """Стабильный между процессами и запусками хеш строки."""
+    return int.from_bytes(
+        hashlib.blake2b(key.encode(), digest_size=8).digest(), 'big'
+    )
+
+
+class HashRing:
+    """Кольцо консистентного хеширования на shards процессов."""
+
+    def __init__(self, shards, replicas=SHARD_REPLICAS):
+        if shards < 1:
+            raise ValueError("Число процессов должно быть положительным.")
+        points = sorted(
+            (_hash(f'{shard}:{replica}'), shard)
+            for shard in range(shards) for replica in range(replicas)
+        )
+        self._hashes = [point for point, _ in points]
+        self._shards = [shard for _, shard in points]
+
+    def owner(self, key):
+        """Номер процесса, которому принадлежит ключ."""
+        index = bisect.bisect(self._hashes, _hash(key))
+        return self._shards[index % len(self._shards)]
+
+
+def shard_from_env(environ=os.environ):
+    """Номер процесса и число процессов из окружения.
+
+    Номер берётся из SHARD_INDEX, а если его нет -- из имени дино
+    Heroku в DYNO (worker.1 -- процесс 0).
+    """
+    count = int(environ.get('SHARD_COUNT', 1))
+    index = environ.get('SHARD_INDEX')
+    if index is None:
+        dyno = environ.get('DYNO', '')
+        index = int(dyno.rpartition('.')[2]) - 1 if '.' in dyno else 0
+    index = int(index)
+    if not 0 <= index < count:
+        raise ValueError(
+            f"Номер процесса {index} вне диапазона 0..{count - 1}."
+        )
+    return index, count
+
+
+def select_tenants(tenants, index, count):
+    """Студенты, которых опрашивает процесс index из count."""
+    if count == 1:
+        return list(tenants)
+    ring = HashRing(count)
+    return [tenant for tenant in tenants if ring.owner(tenant.token) == index]
+
+
+def shared_state_db(environ=os.environ):
+    """True, если база STATE_DB общая для всех процессов движка.
+
+    Файл SQLite общий только для процессов одной машины, поэтому это
+    нужно явно отметить переменной STATE_DB_SHARED=1; запуск через
+    --workers отмечает его сам. На отдельных дино Heroku у каждого
+    процесса своя файловая система и своя база.
+    """
+    return bool(environ.get('STATE_DB')) and (
+        environ.get('STATE_DB_SHARED') == '1'
+    )
+
+
+def worker_environ(index, count, environ=os.environ):
+    """Окружение процесса движка с номером index.
+
+    Процессы одной машины видят один файл STATE_DB, поэтому база
+    отмечается общей.
+    """
+    env = dict(environ, SHARD_INDEX=str(index), SHARD_COUNT=str(count))
+    if environ.get('STATE_DB'):
+        env['STATE_DB_SHARED'] = '1'
+    if int(environ.get('METRICS_PORT', 0)):
+        env['METRICS_PORT'] = str(int(environ['METRICS_PORT']) + index)
+    return env
+
+
+def main(argv=None):
+    """Запускает процессы движка на одной машине и ждёт их завершения."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    args = parser.parse_args(argv)
+    processes = [
+        subprocess.Popen(
+            [sys.executable, '-m', 'homework_bot.engine'],
+            env=worker_environ(index, args.workers)
+        )
+        for index in range(args.workers)
+    ]
+
+    def stop(signum, frame):
+        for process in processes:
+            process.send_signal(signum)
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+    sys.exit(max(process.wait() for process in processes))
+
+
+if __name__ == '__main__':
+    main()
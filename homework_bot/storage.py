@@ -0,0 +1,127 @@
+"""Постоянное хранилище курсоров и статусов на SQLite."""
+import sqlite3
+import threading
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS tenants (
+    token TEXT PRIMARY KEY,
+    cursor INTEGER NOT NULL,
+    last_error TEXT
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS homework_statuses (
+    token TEXT NOT NULL,
+    homework_id INTEGER NOT NULL,
+    status TEXT NOT NULL,
+    date_updated TEXT,
+    homework_name TEXT,
+    PRIMARY KEY (token, homework_id)
+) WITHOUT ROWID;
+'''
+# Столбцы, добавленные после первой версии схемы.
+MIGRATIONS = (
+    ('homework_statuses', 'homework_name', 'TEXT'),
+)
+
+
+class StateStore:
+    """Курсор, последняя ошибка и статусы работ для каждого студента.
+
+    Каждое сохранение -- одна транзакция в журнале WAL с синхронной
+    записью на диск, поэтому после падения процесса база содержит
+    последнее полностью сохранённое состояние. Методы можно вызывать
+    из разных потоков.
+    """
+
+    def __init__(self, path):
+        self._lock = threading.Lock()
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.execute('PRAGMA journal_mode=WAL')
+        self.connection.execute('PRAGMA synchronous=FULL')
+        self.connection.executescript(SCHEMA)
+        self._migrate()
+
+    def _migrate(self):
+        """Добавляет столбцы, которых нет в базе старой версии."""
+        for table, column, kind in MIGRATIONS:
+            columns = {
+                row[1] for row in self.connection.execute(
+                    f'PRAGMA table_info({table})'
+                )
+            }
+            if column not in columns:
+                self.connection.execute(
+                    f'ALTER TABLE {table} ADD COLUMN {column} {kind}'
+                )
+
+    def load(self):
+        """Возвращает {токен: (курсор, последняя ошибка)} одним запросом."""
+        with self._lock:
+            rows = self.connection.execute(
+                'SELECT token, cursor, last_error FROM tenants'
+            ).fetchall()
+        return {token: (cursor, error) for token, cursor, error in rows}
+
+    def last_statuses(self, token):
+        """Возвращает {id работы: (статус, date_updated)} для студента."""
+        with self._lock:
+            rows = self.connection.execute(
+                'SELECT homework_id, status, date_updated '
+                'FROM homework_statuses WHERE token = ?', (token,)
+            ).fetchall()
+        return {
+            homework_id: (status, date_updated)
+            for homework_id, status, date_updated in rows
+        }
+
+    def homeworks(self, token):
+        """Работы студента (id, название, статус, date_updated).
+
+        Работы упорядочены по времени изменения статуса; работы без
+        названия, сохранённые до его появления в схеме, пропускаются.
+        """
+        with self._lock:
+            return self.connection.execute(
+                'SELECT homework_id, homework_name, status, date_updated '
+                'FROM homework_statuses '
+                'WHERE token = ? AND homework_name IS NOT NULL '
+                'ORDER BY date_updated, homework_id', (token,)
+            ).fetchall()
+
+    def all_homeworks(self):
+        """Возвращает {токен: работы как в homeworks} одним запросом."""
+        with self._lock:
+            rows = self.connection.execute(
+                'SELECT token, homework_id, homework_name, status, '
+                'date_updated FROM homework_statuses '
+                'WHERE homework_name IS NOT NULL '
+                'ORDER BY token, date_updated, homework_id'
+            ).fetchall()
+        homeworks = {}
+        for token, *row in rows:
+            homeworks.setdefault(token, []).append(tuple(row))
+        return homeworks
+
+    def save(self, token, cursor, last_error=None, homeworks=()):
+        """Атомарно сохраняет курсор, ошибку и статусы работ студента."""
+        statuses = [
+            (
+                token, homework.id, homework.status.value,
+                homework.date_updated, homework.name
+            )
+            for homework in homeworks if homework.id is not None
+        ]
+        with self._lock, self.connection:
+            self.connection.execute(
+                'INSERT OR REPLACE INTO tenants (token, cursor, last_error) '
+                'VALUES (?, ?, ?)', (token, cursor, last_error)
+            )
+            self.connection.executemany(
+                'INSERT OR REPLACE INTO homework_statuses '
+                '(token, homework_id, status, date_updated, homework_name) '
+                'VALUES (?, ?, ?, ?, ?)', statuses
+            )
+
+    def close(self):
+        """Закрывает соединение с базой."""
+        with self._lock:
+            self.connection.close()
@@ -0,0 +1,196 @@
+"""Потоковый разбор больших ответов API домашки."""
+import codecs
+import json
+import os
+
+import homework
+from homework_bot.validation import ItemError
+
+STREAM_CHUNK_SIZE = int(os.getenv('STREAM_CHUNK_SIZE', 64 * 1024))
+# Сколько работ из потока проверяется за раз.
+STREAM_BATCH = int(os.getenv('STREAM_BATCH', 500))
+WHITESPACE = ' \t\n\r'
+NUMBER_START = '-0123456789'
+NUMBER_CHARS = frozenset('0123456789+-.eE')
+
+_decoder = json.JSONDecoder()
+
+
+class _Reader:
+    """Буфер над потоком байтов, из которого по одному читаются значения.
+
+    В памяти держится только ещё не разобранный хвост потока.
+    """
+
+    def __init__(self, chunks):
+        self._chunks = iter(chunks)
+        self._text = codecs.getincrementaldecoder('utf-8')()
+        self._eof = False
+        self.buffer = ''
+        self.pos = 0
+
+    def _fill(self):
+        """Дочитывает следующий кусок; False, если поток закончился."""
+        if self._eof:
+            return False
+        chunk = next(self._chunks, None)
+        if chunk is None:
+            self._eof = True
+            text = self._text.decode(b'', final=True)
+        else:
+            text = self._text.decode(chunk)
+        self.buffer = self.buffer[self.pos:] + text
+        self.pos = 0
+        return True
+
+    def peek(self):
+        """Возвращает следующий значимый символ, не сдвигая позицию."""
+        while True:
+            while (
+                self.pos < len(self.buffer)
+                and self.buffer[self.pos] in WHITESPACE
+            ):
+                self.pos += 1
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self._fill():
+                return None
+
+    def expect(self, char):
+        """Пропускает ожидаемый разделитель."""
+        if self.peek() != char:
+            raise ValueError(
+                f"Ошибка декодирования ответа API в JSON: ожидался '{char}'."
+            )
+        self.pos += 1
+
+    def _number_cut(self):
+        """True, если число с текущей позиции доходит до конца буфера.
+
+        Такое число могло оборваться на границе куска (например, «1.»
+        перед «5}»), поэтому разбирается только после разделителя или
+        в конце потока.
+        """
+        buffer = self.buffer
+        end = self.pos
+        if end >= len(buffer) or buffer[end] not in NUMBER_START:
+            return False
+        while end < len(buffer) and buffer[end] in NUMBER_CHARS:
+            end += 1
+        return end == len(buffer)
+
+    def value(self):
+        """Декодирует следующее JSON-значение целиком."""
+        self.peek()
+        while True:
+            if self._number_cut() and self._fill():
+                continue
+            try:
+                value, end = _decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError as error:
+                if self._fill():
+                    continue
+                raise ValueError(
+                    f"Ошибка декодирования ответа API в JSON: {error}"
+                )
+            self.pos = end
+            return value
+
+
+def stream_homeworks(chunks, fields):
+    """Генератор домашних работ из ответа API, читаемого по частям.
+
+    Структура ответа проверяется так же, как в check_response, но работы
+    отдаются по одной, не дожидаясь конца ответа. Остальные поля верхнего
+    уровня, например current_date, записываются в словарь fields.
+    """
+    reader = _Reader(chunks)
+    if reader.peek() != '{':
+        raise TypeError(
+            "Ответ API должен быть словарем, но вместо этого "
+            "получен объект другого типа."
+        )
+    reader.pos += 1
+    has_homeworks = False
+    first_key = True
+    while reader.peek() != '}':
+        if not first_key:
+            reader.expect(',')
+        first_key = False
+        key = reader.value()
+        reader.expect(':')
+        if key != 'homeworks':
+            fields[key] = reader.value()
+            continue
+        has_homeworks = True
+        if reader.peek() != '[':
+            raise TypeError(
+                "Данные по домашним работам должны быть списком, "
+                "но вместо этого получен объект другого типа."
+            )
+        reader.pos += 1
+        first = True
+        while reader.peek() != ']':
+            if not first:
+                reader.expect(',')
+            first = False
+            yield reader.value()
+        reader.pos += 1
+    if not has_homeworks:
+        raise KeyError("Отсутствует ключ 'homeworks' в ответе API.")
+
+
+def stream_api_answer(token, timestamp, fields, session=None):
+    """Запрашивает API и отдаёт домашние работы по мере чтения ответа."""
+    response = homework.send_api_request(
+        {'Authorization': f'OAuth {token}'}, timestamp, session, stream=True
+    )
+    try:
+        homework.check_api_status(response)
+        yield from stream_homeworks(
+            response.iter_content(STREAM_CHUNK_SIZE), fields
+        )
+    finally:
+        response.close()
+
+
+def check_homeworks(items, errors=None, batch_size=STREAM_BATCH):
+    """Генератор записей Homework из потока элементов списка работ.
+
+    Элементы проверяются пачками той же схемой HOMEWORK_VALIDATOR, что
+    и в check_response. Некорректные логируются, пропускаются и, если
+    передан список errors, добавляются в него как ItemError с номером
+    элемента в ответе.
+    """
+    batch = []
+    offset = 0
+    for item in items:
+        batch.append(item)
+        if len(batch) >= batch_size:
+            yield from _check_batch(batch, offset, errors)
+            offset += len(batch)
+            batch = []
+    yield from _check_batch(batch, offset, errors)
+
+
+def _check_batch(batch, offset, errors):
+    """Проверяет пачку работ; номера ошибок сдвигаются на offset."""
+    if not batch:
+        return []
+    records, invalid = homework.HOMEWORK_VALIDATOR.validate(batch)
+    invalid = [ItemError(offset + index, error) for index, error in invalid]
+    homework.log_invalid(invalid)
+    if errors is not None:
+        errors.extend(invalid)
+    return records
+
+
+def stream_api_records(token, timestamp, fields, session=None, errors=None):
+    """Запрашивает API и отдаёт проверенные записи Homework по мере чтения.
+
+    Потоковая замена связки get_api_answer и check_response: записи
+    можно сразу передавать в parse_status.
+    """
+    return check_homeworks(
+        stream_api_answer(token, timestamp, fields, session), errors
+    )
@@ -0,0 +1,99 @@
+"""Общий HTTP-клиент с пулом keep-alive соединений и таймаутами."""
+from http import HTTPStatus
+
+import requests
+from requests.adapters import HTTPAdapter
+from telegram.error import NetworkError, RetryAfter, TelegramError
+
+import homework
+
+# API Практикума и Telegram: по одному пулу соединений на каждый хост.
+POOL_HOSTS = 2
+
+
+class HttpClient:
+    """Сессия requests с пулом соединений и таймаутами по умолчанию.
+
+    Соединения переиспользуются между запросами, поэтому TCP и TLS
+    рукопожатия выполняются один раз на соединение, а не на каждый опрос.
+    """
+
+    def __init__(self, pool_size=10, timeout=homework.REQUEST_TIMEOUT):
+        self.timeout = timeout
+        self.session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=POOL_HOSTS, pool_maxsize=pool_size
+        )
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+    def get(self, url, **kwargs):
+        """GET-запрос через пул соединений."""
+        kwargs.setdefault('timeout', self.timeout)
+        return self.session.get(url, **kwargs)
+
+    def post(self, url, **kwargs):
+        """POST-запрос через пул соединений."""
+        kwargs.setdefault('timeout', self.timeout)
+        return self.session.post(url, **kwargs)
+
+    def close(self):
+        """Закрывает все соединения пула."""
+        self.session.close()
+
+
+class TelegramSender:
+    """Отправка сообщений через Bot API поверх общего HTTP-клиента.
+
+    Повторяет интерфейс send_message у telegram.Bot, поэтому подходит
+    для homework.send_message_to_chat.
+    """
+
+    def __init__(self, token, http, api_url=homework.TELEGRAM_API_URL):
+        self.http = http
+        self.base_url = f'{api_url}/bot{token}'
+
+    def _request(self, method, payload, **kwargs):
+        """Вызывает метод Bot API и возвращает поле result ответа."""
+        try:
+            response = self.http.post(
+                f'{self.base_url}/{method}', json=payload, **kwargs
+            )
+        except requests.RequestException as error:
+            raise NetworkError(f"Ошибка соединения с Telegram: {error}")
+        # Сбой на стороне Telegram временный: NetworkError повторяется
+        # очередью отправки, даже если тело ответа не JSON.
+        if response.status_code >= HTTPStatus.INTERNAL_SERVER_ERROR:
+            raise NetworkError(
+                f"Ошибка сервера Telegram: код ответа {response.status_code}"
+            )
+        try:
+            data = response.json()
+        except ValueError as error:
+            raise TelegramError(f"Некорректный ответ Telegram: {error}")
+        if data.get('ok'):
+            return data.get('result')
+        retry_after = data.get('parameters', {}).get('retry_after')
+        if retry_after is not None:
+            raise RetryAfter(retry_after)
+        raise TelegramError(
+            data.get('description', f"Код ответа {response.status_code}")
+        )
+
+    def send_message(self, chat_id, text):
+        """Отправляет текст в чат и возвращает ответ Bot API."""
+        return self._request('sendMessage', {'chat_id': chat_id, 'text': text})
+
+    def get_updates(self, offset=None, timeout=0):
+        """Долгий опрос входящих сообщений начиная с update_id offset.
+
+        Таймаут чтения HTTP больше таймаута ожидания на стороне Telegram,
+        чтобы пустой ответ успел прийти.
+        """
+        connect, read = homework.REQUEST_TIMEOUT
+        return self._request(
+            'getUpdates',
+            {'offset': offset, 'timeout': timeout,
+             'allowed_updates': ['message']},
+            timeout=(connect, read + timeout)
+        )
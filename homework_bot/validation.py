@@ -0,0 +1,88 @@
+"""Проверка пачки элементов ответа API по объявленной схеме."""
+from collections import namedtuple
+
+Field = namedtuple(
+    'Field', ('name', 'required', 'choices'), defaults=(False, None)
+)
+ItemError = namedtuple('ItemError', ('index', 'error'))
+
+
+class BatchValidator:
+    """Проверяет элементы-словари и строит из них записи record.
+
+    Схема -- последовательность Field: обязательное ли поле и, если
+    задано, словарь допустимых значений с их типизированными версиями.
+    record -- namedtuple с полями в порядке схемы; записи создаются
+    напрямую через tuple.__new__, без проверок конструктора. Ошибки
+    не поднимаются, а возвращаются как исключения, поэтому один
+    некорректный элемент не мешает проверить остальные.
+    """
+
+    def __init__(self, record, fields):
+        fields = tuple(fields)
+        if len(fields) != len(record._fields):
+            raise ValueError(
+                f"Схема из {len(fields)} полей не подходит для {record}."
+            )
+        self.record = record
+        self.names = tuple(field.name for field in fields)
+        self.required = tuple(
+            index for index, field in enumerate(fields) if field.required
+        )
+        self.choices = tuple(
+            (index, field.choices) for index, field in enumerate(fields)
+            if field.choices is not None
+        )
+
+    def _check(self, values):
+        """Ошибка в значениях полей или None; приводит значения по choices."""
+        for index in self.required:
+            if values[index] is None or values[index] == '':
+                return KeyError(
+                    f"Отсутствует ключ '{self.names[index]}' в ответе API."
+                )
+        for index, choices in self.choices:
+            value = values[index]
+            if value is None:
+                continue
+            try:
+                typed = choices.get(value)
+            except TypeError:
+                typed = None
+            if typed is None:
+                return ValueError(
+                    f"Неожиданное значение '{self.names[index]}' "
+                    f"в ответе API: {value}"
+                )
+            values[index] = typed
+        return None
+
+    def validate_item(self, item):
+        """Возвращает пару (запись, None) или (None, исключение)."""
+        records, errors = self.validate((item,))
+        if errors:
+            return None, errors[0].error
+        return records[0], None
+
+    def validate(self, items):
+        """Один проход по items: (корректные записи, [ItemError])."""
+        records = []
+        errors = []
+        names = self.names
+        record = self.record
+        new = tuple.__new__
+        check = self._check
+        for index, item in enumerate(items):
+            if not isinstance(item, dict):
+                errors.append(ItemError(index, TypeError(
+                    "Домашняя работа должна быть словарем, но вместо этого "
+                    f"получен объект типа {type(item).__name__}."
+                )))
+                continue
+            values = [item.get(name) for name in names]
+            error = check(values)
+            if error is None:
+                records.append(new(record, values))
+            else:
+                errors.append(ItemError(index, error))
+        return records, errors
@@ -0,0 +1,108 @@
+import json
+
+import pytest
+
+import homework
+from homework_bot import backfill
+from homework_bot.backfill import (
+    backfill_tenant, run, save_checkpoint, tenant_paths, write_batch
+)
+from homework_bot.engine import Tenant
+from homework_bot.fakes import FakePracticum
+
+TENANTS = [Tenant(f'token{number}', str(number)) for number in range(3)]
+
+
+@pytest.fixture
+def practicum(monkeypatch):
+    with FakePracticum(homeworks=5) as server:
+        monkeypatch.setattr(homework, 'ENDPOINT', server.url)
+        yield server
+
+
+def read_lines(path):
+    with open(path, encoding='utf-8') as file:
+        return [json.loads(line) for line in file]
+
+
+def test_history_of_all_tenants_written(practicum, tmp_path):
+    results = run(TENANTS, tmp_path, concurrency=2)
+    assert results == {tenant.chat_id: 5 for tenant in TENANTS}
+    assert practicum.requests == len(TENANTS), (
+        'История студента должна выгружаться одним запросом.'
+    )
+    history, _ = tenant_paths(tmp_path, TENANTS[0])
+    lines = read_lines(history)
+    assert [line['homework_name'] for line in lines] == [
+        f'token0_{number}.zip' for number in range(5)
+    ]
+    assert lines[0]['status'] == 'approved'
+    assert lines[0]['lesson_name'] == 'Проект спринта', (
+        'Работа должна записываться со всеми полями ответа.'
+    )
+
+
+def test_resumes_from_last_checkpoint(practicum, tmp_path):
+    tenant = TENANTS[0]
+    history, checkpoint = tenant_paths(tmp_path, tenant)
+    finished = b'{"homework_name": "old.zip"}\n'
+    with open(history, 'wb') as file:
+        file.write(finished + b'{"homework_name": "tor')
+    save_checkpoint(checkpoint, {'offset': len(finished), 'done': False})
+    assert backfill_tenant(tenant, tmp_path, batch_size=2) == 5
+    assert practicum.requests == 1
+    lines = read_lines(history)
+    assert [line['homework_name'] for line in lines] == ['old.zip'] + [
+        f'token0_{number}.zip' for number in range(5)
+    ], 'Недописанная пачка должна выгружаться заново без мусора в файле.'
+    assert backfill_tenant(tenant, tmp_path) == 0
+    assert practicum.requests == 1, (
+        'Завершённая выгрузка не должна запрашивать API повторно.'
+    )
+
+
+def test_resume_survives_reordered_answer(monkeypatch, tmp_path):
+    def item(number, status='approved', day=1):
+        return {
+            'id': number, 'homework_name': f'hw_{number}.zip',
+            'status': status, 'date_updated': f'2024-01-0{day}T00:00:00Z',
+        }
+
+    answers = iter([
+        [item(number) for number in range(4)],
+        # Пока выгрузка стояла, работа 3 сменила статус и ушла в начало.
+        [item(3, 'reviewing', day=2)] + [item(number) for number in range(4)],
+    ])
+
+    def interrupted(token, from_date, fields, session=None):
+        items = next(answers)
+        if len(items) == 4:
+            yield from items[:2]
+            raise ConnectionError('Соединение оборвалось.')
+        yield from items
+
+    monkeypatch.setattr(backfill, 'stream_api_answer', interrupted)
+    tenant = TENANTS[0]
+    with pytest.raises(ConnectionError):
+        backfill_tenant(tenant, tmp_path, batch_size=1)
+    assert backfill_tenant(tenant, tmp_path, batch_size=1) == 3
+    history, _ = tenant_paths(tmp_path, tenant)
+    written = [
+        (line['id'], line['status']) for line in read_lines(history)
+    ]
+    assert sorted(written) == [
+        (0, 'approved'), (1, 'approved'), (2, 'approved'),
+        (3, 'approved'), (3, 'reviewing'),
+    ], 'Возобновление не должно дублировать или терять работы.'
+
+
+def test_invalid_items_are_skipped(tmp_path):
+    path = tmp_path / 'history.jsonl'
+    with open(path, 'wb') as file:
+        assert write_batch(file, list(enumerate([
+            {'homework_name': 'good.zip', 'status': 'approved', 'extra': 1},
+            {'homework_name': 'bad.zip', 'status': 'unknown'},
+        ]))) == 1
+    assert read_lines(path) == [
+        {'homework_name': 'good.zip', 'status': 'approved', 'extra': 1}
+    ]
@@ -0,0 +1,109 @@
+import asyncio
+
+import pytest
+import requests
+
+import homework
+from homework_bot.breaker import (
+    BREAKER_FAILURES, BREAKER_STATES, BREAKER_TRANSITIONS, CLOSED, HALF_OPEN,
+    OPEN, CircuitBreaker, CircuitOpenError
+)
+from homework_bot.engine import PollingEngine, Tenant
+from homework_bot.fakes import FakePracticum
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return Clock()
+
+
+@pytest.fixture
+def breaker(clock):
+    return CircuitBreaker(failures=3, reset_timeout=10, probes=2, clock=clock)
+
+
+def fail(breaker, times):
+    for _ in range(times):
+        breaker.before_call()
+        breaker.record_failure()
+
+
+def test_opens_after_consecutive_failures(breaker):
+    fail(breaker, 2)
+    breaker.before_call()
+    breaker.record_success()
+    fail(breaker, 2)
+    assert breaker.state == CLOSED
+    opened = BREAKER_TRANSITIONS.value(OPEN)
+    fail(breaker, 1)
+    assert breaker.state == OPEN
+    assert BREAKER_TRANSITIONS.value(OPEN) == opened + 1
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+
+def test_half_open_limits_probes(breaker, clock):
+    fail(breaker, 3)
+    clock.now = 10
+    breaker.before_call()
+    breaker.before_call()
+    assert breaker.state == HALF_OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+    breaker.record_success()
+    assert breaker.state == CLOSED
+    breaker.before_call()
+
+
+def test_failed_probe_reopens(breaker, clock):
+    fail(breaker, 3)
+    clock.now = 10
+    fail(breaker, 1)
+    assert breaker.state == OPEN
+    clock.now = 15
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+
+def test_open_breaker_skips_api_requests(monkeypatch):
+    with FakePracticum(error_rate=1, error_status=503) as practicum:
+        monkeypatch.setattr(homework, 'ENDPOINT', practicum.url)
+        for _ in range(BREAKER_FAILURES):
+            with pytest.raises(ValueError):
+                homework.get_tenant_api_answer('token', 0)
+        with pytest.raises(CircuitOpenError):
+            homework.get_tenant_api_answer('token', 0)
+        assert practicum.requests == BREAKER_FAILURES
+    assert BREAKER_STATES.value(OPEN) == 1
+
+
+def test_engine_skips_polls_while_open(monkeypatch):
+    with FakePracticum(error_rate=1) as practicum:
+        monkeypatch.setattr(homework, 'ENDPOINT', practicum.url)
+        messages = []
+
+        class Outbox:
+            def start(self):
+                pass
+
+            async def close(self):
+                pass
+
+            def put(self, chat_id, text, callback=None):
+                messages.append(text)
+
+        engine = PollingEngine(
+            [Tenant('token', '1')], None, period=0, http=requests,
+            outbox=Outbox()
+        )
+        asyncio.run(engine.run(cycles=8))
+    assert practicum.requests == BREAKER_FAILURES
+    assert len(messages) == 1
@@ -0,0 +1,99 @@
+import asyncio
+
+import pytest
+import requests
+
+import homework
+from homework_bot.cache import ResponseCache
+from homework_bot.engine import PollingEngine, Tenant
+from homework_bot.fakes import FakePracticum
+
+
+@pytest.fixture
+def stand_in_api(monkeypatch):
+    with FakePracticum(homeworks=0, current_date=100, etag=True) as server:
+        monkeypatch.setattr(homework, 'ENDPOINT', server.url)
+        yield server
+
+
+class TestResponseCache:
+    def test_sends_validators_and_reuses_processed_answer(self, stand_in_api):
+        cache = ResponseCache()
+        payload, changed = cache.fetch('token', 0)
+        assert changed and payload['current_date'] == 100
+        cache.mark_processed('token')
+        payload, changed = cache.fetch('token', 0)
+        assert (payload, changed) == (None, False), (
+            'Ответ 304 на уже обработанные данные не должен обрабатываться '
+            'повторно.'
+        )
+        assert stand_in_api.not_modified == 1, (
+            'Повторный запрос должен отправляться с If-None-Match.'
+        )
+
+    def test_unprocessed_answer_is_returned_again(self, stand_in_api):
+        cache = ResponseCache()
+        cache.fetch('token', 0)
+        payload, changed = cache.fetch('token', 0)
+        assert changed and payload['current_date'] == 100, (
+            'Необработанный ответ нельзя отбрасывать как повторный.'
+        )
+
+    def test_identical_body_without_etag(self, stand_in_api, monkeypatch):
+        monkeypatch.setitem(stand_in_api.options, 'etag', False)
+        cache = ResponseCache()
+        cache.fetch('token', 0)
+        cache.mark_processed('token')
+        assert cache.fetch('token', 0) == (None, False)
+        assert cache.fetch('token', 1)[1], (
+            'Запрос с другим from_date не должен попадать в кеш.'
+        )
+
+    def test_new_current_date_is_not_a_change(
+            self, stand_in_api, monkeypatch
+    ):
+        monkeypatch.setitem(stand_in_api.options, 'etag', False)
+        monkeypatch.setitem(stand_in_api.options, 'homeworks', 2)
+        cache = ResponseCache()
+        cache.fetch('token', 0)
+        monkeypatch.setitem(stand_in_api.options, 'current_date', 200)
+        payload, changed = cache.fetch('token', 0)
+        assert changed and payload['current_date'] == 200, (
+            'Необработанный ответ должен нести последний current_date.'
+        )
+        cache.mark_processed('token')
+        monkeypatch.setitem(stand_in_api.options, 'current_date', 300)
+        assert cache.fetch('token', 0) == (None, False), (
+            'Ответ, в котором изменился только current_date, не должен '
+            'обрабатываться повторно.'
+        )
+        monkeypatch.setitem(stand_in_api.options, 'status', 'rejected')
+        assert cache.fetch('token', 0)[1]
+
+    def test_engine_skips_validation_for_unchanged_answer(
+            self, stand_in_api, monkeypatch
+    ):
+        calls = []
+        check_response_items = homework.check_response_items
+
+        def counting_check_response_items(response):
+            calls.append(response)
+            return check_response_items(response)
+
+        monkeypatch.setattr(
+            homework, 'check_response_items', counting_check_response_items
+        )
+        engine = PollingEngine(
+            [Tenant('token', '1')], bot=None, period=0, http=requests
+        )
+        asyncio.run(engine.run(cycles=3))
+        assert stand_in_api.requests == 3
+        assert len(calls) == 1, (
+            'Неизменившийся ответ API не должен проверяться повторно.'
+        )
+
+    def test_cache_is_bounded(self, stand_in_api):
+        cache = ResponseCache(max_entries=2)
+        for token in ('a', 'b', 'c'):
+            cache.fetch(token, 0)
+        assert len(cache) == 2
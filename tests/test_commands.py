@@ -0,0 +1,149 @@
+import asyncio
+
+import requests
+
+import homework
+from homework_bot.commands import (
+    HELP_MESSAGE, NO_STATUSES_MESSAGE, CommandHandler, StatusCache,
+    StoredStatuses
+)
+from homework_bot.engine import PollingEngine, Tenant
+from homework_bot.fakes import FakePracticum, FakeTelegram
+from homework_bot.outbox import Outbox
+from homework_bot.storage import StateStore
+from homework_bot.transport import TelegramSender
+
+
+def record(cache, chat_id, *statuses):
+    homeworks = [
+        homework.Homework(
+            number, f'hw{number}', homework.HomeworkStatus(status), None
+        )
+        for number, status in statuses
+    ]
+    cache.record(
+        chat_id, homeworks, [homework.parse_status(item) for item in homeworks]
+    )
+
+
+class TestStatusCache:
+    def test_status_keeps_latest_per_homework(self):
+        cache = StatusCache()
+        record(cache, '1', (1, 'reviewing'), (2, 'reviewing'))
+        record(cache, '1', (1, 'approved'))
+        assert cache.status('1') == [
+            homework.STATUS_MESSAGES[homework.HomeworkStatus.REVIEWING]
+            .format('hw2'),
+            homework.STATUS_MESSAGES[homework.HomeworkStatus.APPROVED]
+            .format('hw1'),
+        ]
+        assert len(cache.history('1')) == 3
+
+    def test_cache_is_bounded(self):
+        cache = StatusCache(max_chats=2, history_size=2)
+        for chat_id in ('1', '2', '3'):
+            record(
+                cache, chat_id,
+                (1, 'reviewing'), (2, 'approved'), (3, 'rejected')
+            )
+        assert cache.status('1') == []
+        assert len(cache.status('3')) == 2
+        assert len(cache.history('3')) == 2
+
+
+def test_reply():
+    cache = StatusCache()
+    handler = CommandHandler(None, cache, None, ['1'])
+    assert handler.reply('1', '/status') == NO_STATUSES_MESSAGE
+    record(cache, '1', (1, 'approved'))
+    assert 'hw1' in handler.reply('1', '/status@homework_bot')
+    assert handler.reply('1', '/start') == HELP_MESSAGE
+    assert handler.reply('1', 'привет') is None
+
+
+def test_commands_are_answered_from_cache():
+    cache = StatusCache()
+    record(cache, '1', (1, 'approved'))
+
+    async def scenario(telegram):
+        sender = TelegramSender('bot', requests, telegram.url)
+        outbox = Outbox(sender, chat_rate=100)
+        handler = CommandHandler(sender, cache, outbox, ['1'], timeout=0.1)
+        outbox.start()
+        task = asyncio.create_task(handler.run())
+        telegram.send_command(1, '/status')
+        telegram.send_command(999, '/status')
+        telegram.send_command(1, '/history')
+        while len(telegram.messages) < 2:
+            await asyncio.sleep(0.01)
+        task.cancel()
+        await outbox.close()
+        return handler.offset
+
+    with FakeTelegram() as telegram:
+        offset = asyncio.run(scenario(telegram))
+    assert offset == 4
+    assert [chat_id for chat_id, _ in telegram.messages] == ['1', '1']
+    assert all('hw1' in text for _, text in telegram.messages)
+
+
+def test_engine_fills_status_cache(monkeypatch):
+    with FakePracticum(homeworks=2) as practicum, FakeTelegram() as telegram:
+        monkeypatch.setattr(homework, 'ENDPOINT', practicum.url)
+        sender = TelegramSender('bot', requests, telegram.url)
+        engine = PollingEngine(
+            [Tenant('token', '1')], sender, period=0, http=requests,
+            outbox=Outbox(sender, chat_rate=100), commands=True
+        )
+        engine.commands.timeout = 0.1
+        asyncio.run(engine.run(cycles=1))
+    assert practicum.requests == 1
+    assert engine.statuses.status('1') == [
+        homework.parse_status({'homework_name': name, 'status': 'approved'})
+        for name in ('token_0.zip', 'token_1.zip')
+    ]
+
+
+class RecordingOutbox:
+    def __init__(self):
+        self.messages = []
+
+    def put(self, chat_id, text, callback=None):
+        self.messages.append((chat_id, text))
+
+
+def test_other_shards_chats_answered_from_store(tmp_path):
+    store = StateStore(tmp_path / 'state.sqlite3')
+    store.save('other', 100, homeworks=[homework.Homework(
+        1, 'hw_other', homework.HomeworkStatus.APPROVED, 'd'
+    )])
+    outbox = RecordingOutbox()
+    handler = CommandHandler(
+        None, StatusCache(), outbox, ['1'],
+        stored=StoredStatuses(store, {'2': 'other'})
+    )
+    for update_id, chat_id in enumerate((2, 1, 999)):
+        handler.handle({'update_id': update_id, 'message': {
+            'chat': {'id': chat_id}, 'text': '/status'
+        }})
+    store.close()
+    assert outbox.messages == [
+        ('2', homework.STATUS_MESSAGES[homework.HomeworkStatus.APPROVED]
+         .format('hw_other')),
+        ('1', NO_STATUSES_MESSAGE),
+    ], 'Команды из чатов других процессов не должны теряться.'
+
+
+def test_own_chats_answered_after_restart(tmp_path):
+    store = StateStore(tmp_path / 'state.sqlite3')
+    store.save('token', 100, homeworks=[homework.Homework(
+        1, 'hw.zip', homework.HomeworkStatus.APPROVED, 'd'
+    )])
+    engine = PollingEngine(
+        [Tenant('token', '1')], None, period=0, http=requests, store=store,
+        outbox=RecordingOutbox(), commands=True
+    )
+    assert engine.commands.reply('1', '/status') == homework.parse_status(
+        {'homework_name': 'hw.zip', 'status': 'approved'}
+    ), 'После перезапуска /status должен отвечать статусами из store.'
+    store.close()
@@ -0,0 +1,35 @@
+import homework
+
+HOMEWORK = {
+    'id': 1, 'homework_name': 'hw.zip', 'status': 'approved',
+    'date_updated': '2024-01-01T00:00:00Z',
+}
+
+
+def test_from_date_overlaps_cursor(monkeypatch):
+    monkeypatch.setattr(homework, 'CURSOR_OVERLAP', 60)
+    assert homework.cursor_from_date(1000) == 940
+    assert homework.cursor_from_date(10) == 0
+
+
+def test_only_known_statuses_advance_cursor():
+    assert homework.advance_cursor(None, {'homeworks': []}, 100, None) == 100
+    assert homework.advance_cursor(
+        None, {'homeworks': [HOMEWORK], 'current_date': 200}, 100, None
+    ) == 200
+
+
+def test_invalid_homeworks_hold_cursor():
+    response = {
+        'homeworks': [HOMEWORK, {'homework_name': 'bad.zip'}],
+        'current_date': 200,
+    }
+    records, invalid = homework.check_response_items(response)
+    assert [record.id for record in records] == [1]
+    assert [index for index, _ in invalid] == [1]
+    assert [
+        index for index, _ in homework.check_response(response).errors
+    ] == [1]
+    assert homework.advance_cursor(None, response, 100, None, invalid) == 100
+    assert homework.response_cursor(response, 100, invalid) == 100
+    assert homework.response_cursor(response, 100) == 200
@@ -0,0 +1,38 @@
+from homework import Homework, HomeworkStatus
+from homework_bot.dedup import DedupIndex
+from homework_bot.storage import StateStore
+
+HOMEWORK = Homework(
+    1, 'hw.zip', HomeworkStatus.APPROVED, '2024-01-01T00:00:00Z'
+)
+
+
+class TestDedupIndex:
+    def test_repeated_status_is_filtered(self):
+        index = DedupIndex()
+        assert index.filter_new('token', [HOMEWORK]) == [HOMEWORK]
+        index.remember('token', [HOMEWORK])
+        assert index.filter_new('token', [HOMEWORK]) == [], (
+            'Уже отправленный статус не должен отправляться повторно.'
+        )
+        changed = HOMEWORK._replace(status=HomeworkStatus.REJECTED)
+        assert index.filter_new('token', [HOMEWORK, changed]) == [changed]
+        assert index.filter_new('other', [HOMEWORK]) == [HOMEWORK]
+
+    def test_size_and_ttl_are_bounded(self):
+        index = DedupIndex(max_size=2, ttl=10)
+        homeworks = [HOMEWORK._replace(id=number) for number in range(5)]
+        index.remember('token', homeworks, now=0)
+        assert len(index) == 2, 'Размер индекса должен быть ограничен.'
+        last = homeworks[-1]
+        assert index.filter_new('token', [last], now=5) == []
+        assert index.filter_new('token', [last], now=11) == [last]
+
+    def test_backed_by_state_store(self, tmp_path):
+        store = StateStore(tmp_path / 'state.sqlite3')
+        store.save('token', 100, homeworks=[HOMEWORK])
+        index = DedupIndex(store=store)
+        assert index.filter_new('token', [HOMEWORK]) == [], (
+            'Статусы из хранилища должны считаться уже отправленными.'
+        )
+        store.close()
@@ -0,0 +1,111 @@
+import asyncio
+
+import requests
+
+import homework
+from homework_bot.breaker import BreakerRegistry
+from homework_bot.digest import RECOVERY_MESSAGE, ErrorDigest
+from homework_bot.engine import PollingEngine, Tenant
+from homework_bot.fakes import FakePracticum
+
+
+class TestErrorDigest:
+    def test_first_error_is_reported_at_once(self):
+        digest = ErrorDigest(window=60)
+        text = digest.record('1', ConnectionError('нет сети'), now=0)
+        assert 'ConnectionError x1' in text
+        assert 'нет сети' in text
+
+    def test_errors_are_grouped_within_window(self):
+        digest = ErrorDigest(window=60)
+        digest.record('1', ConnectionError('нет сети'), now=0)
+        for now, error in enumerate(
+            [ValueError('код 500'), ConnectionError('таймаут')] * 5, start=1
+        ):
+            assert digest.record('1', error, now=now) is None
+        text = digest.record('1', ValueError('код 502'), now=61)
+        assert 'ValueError x6' in text
+        assert 'ConnectionError x5' in text
+        assert 'код 502' in text
+
+    def test_recovery_waits_for_quiet_period(self):
+        digest = ErrorDigest(window=60, quiet=30)
+        assert digest.resolve('1', now=0) is None
+        digest.record('1', ConnectionError('нет сети'), now=0)
+        digest.record('1', ConnectionError('нет сети'), now=1)
+        assert digest.resolve('1', now=2) is None
+        text = digest.resolve('1', now=32)
+        assert text.startswith(RECOVERY_MESSAGE)
+        assert 'ConnectionError x1' in text
+        assert digest.resolve('1', now=33) is None
+
+    def test_flapping_errors_do_not_flood_chat(self):
+        digest = ErrorDigest(window=600, quiet=120)
+        sent = []
+        for flap in range(6):
+            now = flap * 60
+            sent.append(digest.record('1', ValueError('код 500'), now=now))
+            sent.append(digest.resolve('1', now=now + 30))
+        assert len([text for text in sent if text]) == 1, (
+            'Ошибки вперемешку с успешными опросами не должны давать '
+            'сообщение на каждый цикл.'
+        )
+
+    def test_window_survives_recovery(self):
+        digest = ErrorDigest(window=600, quiet=0)
+        assert digest.record('1', ValueError('код 500'), now=0)
+        assert digest.resolve('1', now=10) == RECOVERY_MESSAGE
+        assert digest.record('1', ValueError('код 500'), now=20) is None
+        assert digest.resolve('1', now=30) is None
+        assert digest.record('1', ValueError('код 500'), now=600)
+
+    def test_undelivered_digest_is_retried(self):
+        digest = ErrorDigest(window=60)
+        digest.record('1', ConnectionError('нет сети'), now=0)
+        digest.failed('1')
+        assert digest.record('1', ConnectionError('нет сети'), now=1)
+
+    def test_reported_before_restart(self):
+        digest = ErrorDigest(quiet=0)
+        digest.mark_reported('1')
+        assert digest.resolve('1') == RECOVERY_MESSAGE
+
+
+class RecordingOutbox:
+    def __init__(self):
+        self.messages = []
+
+    def start(self):
+        pass
+
+    async def close(self):
+        pass
+
+    def put(self, chat_id, text, callback=None):
+        self.messages.append((chat_id, text))
+
+
+def test_engine_sends_one_digest_and_one_recovery(monkeypatch):
+    outbox = RecordingOutbox()
+    with FakePracticum(error_rate=1, homeworks=0) as practicum:
+        monkeypatch.setattr(homework, 'ENDPOINT', practicum.url)
+        monkeypatch.setattr(
+            homework, 'api_breakers', BreakerRegistry(failures=100)
+        )
+        engine = PollingEngine(
+            [Tenant(f'token{number}', str(number)) for number in range(3)],
+            None, period=0, http=requests, outbox=outbox
+        )
+        engine.errors.quiet = 0
+        asyncio.run(engine.run(cycles=3))
+        practicum.options['error_rate'] = 0
+        asyncio.run(engine.run(cycles=2))
+    texts = {}
+    for chat_id, text in outbox.messages:
+        texts.setdefault(chat_id, []).append(text)
+    assert len(texts) == 3
+    for messages in texts.values():
+        assert len(messages) == 2
+        assert 'ValueError x1' in messages[0]
+        assert messages[1].startswith(RECOVERY_MESSAGE)
+        assert 'ValueError x2' in messages[1]
@@ -0,0 +1,266 @@
+import asyncio
+import json
+import threading
+
+import requests
+
+import homework
+from homework_bot.engine import Delivery, PollingEngine, Tenant
+
+
+class RecordingBot:
+    def __init__(self):
+        self.sent = []
+
+    def send_message(self, chat_id, text):
+        self.sent.append((chat_id, text))
+
+
+class JsonResponse:
+    def __init__(self, data, status_code=200, headers=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+        self.content = json.dumps(data).encode()
+
+    def json(self):
+        return json.loads(self.content)
+
+
+def mock_get_by_token(handlers):
+    def mocked_get(url, headers=None, **kwargs):
+        token = headers['Authorization'].split(' ', 1)[1]
+        return handlers[token]()
+    return mocked_get
+
+
+def approved_response():
+    return JsonResponse({
+        'homeworks': [{'homework_name': 'hw.zip', 'status': 'approved'}],
+        'current_date': 100,
+    })
+
+
+class TestPollingEngine:
+    def test_each_tenant_notified_in_own_chat(self, monkeypatch):
+        monkeypatch.setattr(requests, 'get', mock_get_by_token({
+            'a': approved_response, 'b': approved_response,
+        }))
+        bot = RecordingBot()
+        tenants = [Tenant('a', '1'), Tenant('b', '2')]
+        engine = PollingEngine(
+            tenants, bot, concurrency=2, period=0, http=requests
+        )
+        for state in engine.states.values():
+            state.timestamp = 50
+        asyncio.run(engine.run(cycles=1))
+        assert sorted(chat for chat, _ in bot.sent) == ['1', '2'], (
+            'Каждый студент должен получить уведомление в свой чат.'
+        )
+        assert all(state.timestamp == 100 for state in engine.states.values())
+
+    def test_slow_and_failing_tenants_do_not_stall_others(self, monkeypatch):
+        fast_sent = threading.Event()
+
+        class SignallingBot(RecordingBot):
+            def send_message(self, chat_id, text):
+                super().send_message(chat_id, text)
+                if chat_id == '3':
+                    fast_sent.set()
+
+        bot = SignallingBot()
+
+        def slow():
+            assert fast_sent.wait(1), (
+                'Медленный запрос одного студента не должен задерживать '
+                'других.'
+            )
+            return approved_response()
+
+        def failing():
+            raise requests.RequestException('boom')
+
+        monkeypatch.setattr(requests, 'get', mock_get_by_token({
+            'slow': slow, 'failing': failing, 'fast': approved_response,
+        }))
+        tenants = [
+            Tenant('slow', '1'), Tenant('failing', '2'), Tenant('fast', '3')
+        ]
+        asyncio.run(PollingEngine(
+            tenants, bot, concurrency=3, period=0, http=requests
+        ).run(cycles=1))
+        chats = [chat for chat, _ in bot.sent]
+        assert chats.index('3') < chats.index('1')
+        assert not any(
+            chat == '1' and 'Сбой' in text for chat, text in bot.sent
+        )
+        assert any(
+            chat == '2' and 'Сбой' in text for chat, text in bot.sent
+        )
+
+    def test_all_homeworks_merged_into_one_message(self, monkeypatch):
+        def batch_response():
+            return JsonResponse({
+                'homeworks': [
+                    {
+                        'homework_name': 'second.zip', 'status': 'rejected',
+                        'date_updated': '2024-01-02T00:00:00Z',
+                    },
+                    {
+                        'homework_name': 'first.zip', 'status': 'approved',
+                        'date_updated': '2024-01-01T00:00:00Z',
+                    },
+                ],
+                'current_date': 100,
+            })
+
+        monkeypatch.setattr(
+            requests, 'get', mock_get_by_token({'a': batch_response})
+        )
+        bot = RecordingBot()
+        asyncio.run(PollingEngine(
+            [Tenant('a', '1')], bot, period=0, http=requests
+        ).run(cycles=1))
+        assert len(bot.sent) == 1, (
+            'Изменения нескольких работ должны уходить одним сообщением.'
+        )
+        text = bot.sent[0][1]
+        assert text.index('first.zip') < text.index('second.zip'), (
+            'Работы в сообщении должны идти по времени изменения статуса.'
+        )
+
+    def test_stop_interrupts_waiting_for_next_poll(self, monkeypatch):
+        monkeypatch.setattr(
+            requests, 'get', mock_get_by_token({'a': approved_response})
+        )
+        bot = RecordingBot()
+        engine = PollingEngine([Tenant('a', '1')], bot, http=requests)
+        engine.scheduler.first_poll_in = lambda state: 0
+
+        async def stop_after_first_poll():
+            task = asyncio.create_task(engine.run())
+            while not bot.sent:
+                await asyncio.sleep(0.01)
+            engine.stop()
+            await asyncio.wait_for(task, 1)
+
+        asyncio.run(stop_after_first_poll())
+        assert len(bot.sent) == 1, (
+            'Остановка должна прерывать ожидание следующего опроса.'
+        )
+
+    def test_requests_only_delta_since_cursor(self, monkeypatch):
+        monkeypatch.setattr(homework, 'CURSOR_OVERLAP', 60)
+        homework_item = {
+            'id': 1, 'homework_name': 'hw.zip', 'status': 'approved',
+            'date_updated': '2024-01-01T00:00:00Z',
+        }
+        answers = iter((1000, 1300, 1600))
+        from_dates = []
+
+        def mocked_get(url, params=None, **kwargs):
+            from_dates.append(params['from_date'])
+            return JsonResponse({
+                'homeworks': [homework_item], 'current_date': next(answers)
+            })
+
+        monkeypatch.setattr(requests, 'get', mocked_get)
+        bot = RecordingBot()
+        tenant = Tenant('a', '1')
+        engine = PollingEngine([tenant], bot, period=0, http=requests)
+        engine.states[tenant].timestamp = 500
+        engine.sent_statuses.remember(
+            tenant.token, [homework.build_homework(homework_item)]
+        )
+        asyncio.run(engine.run(cycles=3))
+        assert from_dates == [440, 940, 1240], (
+            'from_date должен отступать на CURSOR_OVERLAP от последнего '
+            'current_date.'
+        )
+        assert not bot.sent, (
+            'Статусы из запаса не должны отправляться повторно.'
+        )
+        assert engine.states[tenant].timestamp == 1600
+
+    def test_invalid_homeworks_hold_cursor_and_are_reported(
+            self, monkeypatch
+    ):
+        monkeypatch.setattr(requests, 'get', lambda *args, **kwargs: (
+            JsonResponse({
+                'homeworks': [
+                    {'homework_name': 'hw.zip', 'status': 'approved'},
+                    {'homework_name': 'bad.zip', 'status': 'unknown'},
+                ],
+                'current_date': 100,
+            })
+        ))
+        bot = RecordingBot()
+        tenant = Tenant('a', '1')
+        engine = PollingEngine([tenant], bot, period=0, http=requests)
+        engine.states[tenant].timestamp = 50
+        asyncio.run(engine.run(cycles=2))
+        assert len(bot.sent) == 2, (
+            'Корректные статусы отправляются один раз, ошибка -- в сводке.'
+        )
+        assert 'Сбой в работе программы' in bot.sent[1][1]
+        assert engine.states[tenant].timestamp == 50, (
+            'Курсор не должен сдвигаться за некорректные работы.'
+        )
+
+
+class TestCursorAfterDelivery:
+    def deliver(self, engine, tenant, delivery, delivered):
+        asyncio.run(
+            engine._statuses_delivered(tenant, [], delivery, delivered)
+        )
+
+    def make(self):
+        tenant = Tenant('a', '1')
+        engine = PollingEngine([tenant], None, http=object())
+        state = engine.states[tenant]
+        state.timestamp = 100
+        return engine, tenant, state
+
+    def test_cursor_never_moves_backwards(self):
+        engine, tenant, state = self.make()
+        delivery = Delivery(50)
+        state.deliveries.append(delivery)
+        self.deliver(engine, tenant, delivery, True)
+        assert state.timestamp == 100
+
+    def test_failed_message_holds_cursor_for_later_ones(self):
+        engine, tenant, state = self.make()
+        first, second = Delivery(200), Delivery(300)
+        state.deliveries.extend((first, second))
+        self.deliver(engine, tenant, second, True)
+        assert state.timestamp == 100, (
+            'Курсор не должен обгонять сообщение, которое ещё в очереди.'
+        )
+        self.deliver(engine, tenant, first, False)
+        assert state.timestamp == 100, (
+            'Курсор не должен уходить за статусы недоставленного сообщения.'
+        )
+        assert not state.deliveries
+
+
+def test_finished_poll_wakes_dispatcher_only_for_earlier_due():
+    engine = PollingEngine(
+        [Tenant('a', '1')], bot=None, period=0, http=requests
+    )
+    engine._wakeup = asyncio.Event()
+    engine._sleep_until = 100
+    engine.due.schedule('a', 100)
+    engine.due.schedule('b', 200)
+    engine._poll_finished({'poll'}, 'poll')
+    assert not engine._wakeup.is_set(), (
+        'Опрос со сроком позже ожидаемого не должен будить диспетчер.'
+    )
+    engine.due.schedule('b', 50)
+    engine._poll_finished({'poll'}, 'poll')
+    assert engine._wakeup.is_set()
+    engine._wakeup.clear()
+    engine.due.cancel('a')
+    engine.due.cancel('b')
+    engine._poll_finished({'poll'}, 'poll')
+    assert engine._wakeup.is_set(), (
+        'Диспетчер должен проснуться, когда опросов не осталось.'
+    )
@@ -0,0 +1,88 @@
+import asyncio
+
+import pytest
+import requests
+from telegram.error import RetryAfter
+
+import homework
+from homework_bot.engine import PollingEngine, Tenant
+from homework_bot.fakes import FakePracticum, FakeTelegram
+from homework_bot.outbox import Outbox
+from homework_bot.transport import TelegramSender
+
+
+@pytest.fixture
+def point_to(monkeypatch):
+    def point(server):
+        monkeypatch.setattr(homework, 'ENDPOINT', server.url)
+        return server
+    return point
+
+
+class TestFakePracticum:
+    def test_large_payload(self, point_to):
+        with point_to(FakePracticum(homeworks=500)):
+            homeworks = homework.check_response(
+                homework.get_tenant_api_answer('token', 0)
+            )
+        assert len(homeworks) == 500
+
+    @pytest.mark.parametrize('options', [
+        {'error_rate': 1, 'error_status': 503},
+        {'malformed_rate': 1},
+    ])
+    def test_failures_become_value_errors(self, point_to, options):
+        with point_to(FakePracticum(**options)):
+            with pytest.raises(ValueError):
+                homework.get_tenant_api_answer('token', 0)
+
+    def test_latency_hits_read_timeout(self, point_to, monkeypatch):
+        monkeypatch.setattr(homework, 'REQUEST_TIMEOUT', (1, 0.05))
+        with point_to(FakePracticum(latency=0.2)):
+            with pytest.raises(ConnectionError):
+                homework.get_tenant_api_answer('token', 0)
+
+
+class TestFakeTelegram:
+    def test_rate_limit_answer(self):
+        with FakeTelegram(limit_every=2, retry_after=5) as telegram:
+            sender = TelegramSender('1:a', requests, api_url=telegram.url)
+            sender.send_message('1', 'first')
+            with pytest.raises(RetryAfter) as error:
+                sender.send_message('1', 'second')
+        assert error.value.retry_after == 5
+        assert telegram.messages == [('1', 'first')]
+
+    def test_engine_end_to_end(self, point_to):
+        with point_to(FakePracticum(homeworks=2)), FakeTelegram(
+            limit_every=2, retry_after=0
+        ) as telegram:
+            sender = TelegramSender('1:a', requests, api_url=telegram.url)
+            engine = PollingEngine(
+                [Tenant('a', '1'), Tenant('b', '2')], bot=None, period=0,
+                http=requests,
+                outbox=Outbox(sender, chat_rate=100)
+            )
+            asyncio.run(engine.run(cycles=1))
+        assert sorted(chat for chat, _ in telegram.messages) == ['1', '2'], (
+            'После ответа 429 сообщение должно быть доставлено повторно.'
+        )
+
+    def test_bot_sends_through_stand_in(self, monkeypatch):
+        from telegram import Bot
+        monkeypatch.setattr(homework, 'TELEGRAM_CHAT_ID', '42')
+        with FakeTelegram() as telegram:
+            bot = Bot(token='123:abc', base_url=f'{telegram.url}/bot')
+            assert homework.send_message(bot, 'text'), (
+                'telegram.Bot должен принимать ответ заглушки на sendMessage.'
+            )
+        assert telegram.messages == [('42', 'text')]
+
+    def test_bad_payload_is_bad_request(self):
+        with FakeTelegram() as telegram:
+            response = requests.post(
+                f'{telegram.url}/bot1:a/sendMessage', json={'text': 'x'}
+            )
+        assert response.status_code == 400
+        assert response.json()['ok'] is False
+        assert telegram.messages == []
@@ -0,0 +1,46 @@
+import pytest
+
+import homework
+from homework import Homework, HomeworkStatus
+
+
+class TestHomeworkRecords:
+    def test_check_response_builds_records(self):
+        homeworks = homework.check_response({'homeworks': [{
+            'id': 7, 'homework_name': 'hw.zip', 'status': 'reviewing',
+            'date_updated': '2024-01-01T00:00:00Z', 'lesson_name': 'Урок',
+        }]})
+        assert homeworks == [Homework(
+            7, 'hw.zip', HomeworkStatus.REVIEWING, '2024-01-01T00:00:00Z'
+        )], 'check_response должна возвращать записи Homework.'
+        assert not hasattr(homeworks[0], '__dict__')
+
+    def test_parse_status_accepts_records_and_dicts(self):
+        record = Homework(None, 'hw.zip', HomeworkStatus.APPROVED, None)
+        from_dict = homework.parse_status(
+            {'homework_name': 'hw.zip', 'status': 'approved'}
+        )
+        assert homework.parse_status(record) == from_dict
+        assert from_dict == (
+            'Изменился статус проверки работы "hw.zip". '
+            f'{homework.HOMEWORK_VERDICTS["approved"]}'
+        )
+
+    @pytest.mark.parametrize('item, error', [
+        ('hw.zip', TypeError),
+        ({'status': 'approved'}, KeyError),
+        ({'homework_name': 'hw.zip'}, KeyError),
+        ({'homework_name': 'hw.zip', 'status': 'unknown'}, ValueError),
+    ])
+    def test_build_homework_rejects_invalid_items(self, item, error):
+        with pytest.raises(error):
+            homework.build_homework(item)
+
+    def test_parse_statuses_orders_by_date_updated(self):
+        homeworks = [
+            Homework(1, 'late', HomeworkStatus.REJECTED, '2024-01-02'),
+            Homework(2, 'early', HomeworkStatus.APPROVED, '2024-01-01'),
+        ]
+        message = homework.parse_statuses(homeworks)
+        assert message.index('early') < message.index('late')
+        assert len(message.splitlines()) == 2
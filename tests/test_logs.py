@@ -0,0 +1,70 @@
+import io
+import json
+import logging
+import threading
+
+import pytest
+
+from homework_bot.logs import SAMPLED, configure_logging, stop_listener
+
+
+class CountingArg:
+    def __init__(self):
+        self.formatted = 0
+        self.threads = set()
+
+    def __str__(self):
+        self.formatted += 1
+        self.threads.add(threading.get_ident())
+        return 'значение'
+
+
+@pytest.fixture
+def make_logger(request):
+    def make(**options):
+        logger = logging.getLogger(f'test_logs.{request.node.name}')
+        logger.propagate = False
+        stream = io.StringIO()
+        listener = configure_logging(logger, stream, **options)
+        request.addfinalizer(lambda: logger.handlers.clear())
+        if listener is not None:
+            request.addfinalizer(lambda: stop_listener(listener))
+        return logger, stream, listener
+    return make
+
+
+def test_json_format(make_logger):
+    logger, stream, _ = make_logger(use_queue=False, kind='json')
+    logger.info('Чат %s', 42)
+    record = json.loads(stream.getvalue())
+    assert record['level'] == 'INFO'
+    assert record['message'] == 'Чат 42'
+
+
+def test_debug_sampling(make_logger):
+    logger, stream, _ = make_logger(use_queue=False, sample_debug=10)
+    for _ in range(100):
+        logger.debug('Новых статусов нет.', extra=SAMPLED)
+    logger.debug('Обычная запись.')
+    lines = stream.getvalue().splitlines()
+    assert len(lines) == 11
+    assert lines[-1].endswith('Обычная запись.')
+
+
+def test_queue_formats_in_listener_thread(make_logger):
+    logger, stream, listener = make_logger(use_queue=True)
+    argument = CountingArg()
+    logger.info('Сообщение: %s', argument)
+    stop_listener(listener)
+    assert 'Сообщение: значение' in stream.getvalue()
+    assert argument.formatted == 1
+    assert threading.get_ident() not in argument.threads
+
+
+def test_disabled_level_is_not_formatted(make_logger):
+    logger, stream, listener = make_logger(use_queue=True, level='INFO')
+    argument = CountingArg()
+    logger.debug('Сообщение: %s', argument)
+    stop_listener(listener)
+    assert argument.formatted == 0
+    assert stream.getvalue() == ''
@@ -0,0 +1,100 @@
+import asyncio
+
+import pytest
+import requests
+
+import homework
+from homework_bot import metrics
+from homework_bot.engine import PollingEngine, Tenant
+from homework_bot.fakes import FakePracticum, FakeTelegram
+from homework_bot.outbox import Outbox
+from homework_bot.transport import TelegramSender
+
+
+@pytest.fixture
+def registry():
+    return metrics.Registry()
+
+
+class TestMetricTypes:
+    def test_counter_render(self, registry):
+        counter = metrics.Counter(
+            'test_total', 'Проверка.', ('error',), registry=registry
+        )
+        counter.inc('KeyError')
+        counter.inc('KeyError', amount=2)
+        assert counter.value('KeyError') == 3
+        assert registry.render() == (
+            '# HELP test_total Проверка.\n'
+            '# TYPE test_total counter\n'
+            'test_total{error="KeyError"} 3\n'
+        )
+
+    def test_histogram_buckets_are_cumulative(self, registry):
+        histogram = metrics.Histogram(
+            'test_seconds', 'Проверка.', buckets=(0.1, 1), registry=registry
+        )
+        for value in (0.05, 0.5, 5):
+            histogram.observe(value)
+        assert histogram.count() == 3
+        lines = registry.render().splitlines()
+        assert 'test_seconds_bucket{le="0.1"} 1' in lines
+        assert 'test_seconds_bucket{le="1"} 2' in lines
+        assert 'test_seconds_bucket{le="+Inf"} 3' in lines
+        assert 'test_seconds_count 3' in lines
+        assert 'test_seconds_sum 5.55' in lines
+
+    def test_gauge_function(self, registry):
+        gauge = metrics.Gauge(
+            'test_depth', 'Проверка.', ('queue',), registry=registry
+        )
+        items = [1, 2]
+        gauge.set_function(lambda: len(items), 'outbox')
+        items.append(3)
+        assert 'test_depth{queue="outbox"} 3' in registry.render()
+
+
+def test_http_endpoint(registry):
+    metrics.Counter('served_total', 'Проверка.', registry=registry).inc()
+    server = metrics.start_http_server(port=0, registry=registry)
+    try:
+        url = f'http://127.0.0.1:{server.server_port}'
+        response = requests.get(f'{url}/metrics', timeout=1)
+        assert response.status_code == 200
+        assert 'served_total 1' in response.text
+        assert requests.get(f'{url}/other', timeout=1).status_code == 404
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_validation_failures_counted():
+    before = metrics.VALIDATION_FAILURES.value('check_response', 'KeyError')
+    with pytest.raises(KeyError):
+        homework.check_response({'current_date': 0})
+    after = metrics.VALIDATION_FAILURES.value('check_response', 'KeyError')
+    assert after == before + 1
+
+
+def test_engine_records_latencies(monkeypatch):
+    with FakePracticum(error_rate=0.5, seed=1) as practicum, \
+            FakeTelegram(retry_after=0) as telegram:
+        monkeypatch.setattr(homework, 'ENDPOINT', practicum.url)
+        api_calls = metrics.API_LATENCY.count('200')
+        api_errors = metrics.API_LATENCY.count('500')
+        sends = metrics.SEND_LATENCY.count()
+        lags = metrics.SCHEDULER_LAG.count()
+        sender = TelegramSender('bot', requests, telegram.url)
+        engine = PollingEngine(
+            [Tenant(f'token{number}', number) for number in range(4)],
+            sender, period=0, http=requests,
+            outbox=Outbox(sender, chat_rate=100)
+        )
+        asyncio.run(engine.run(cycles=2))
+    assert (
+        metrics.API_LATENCY.count('200') - api_calls
+        + metrics.API_LATENCY.count('500') - api_errors
+    ) == 8
+    assert metrics.SEND_LATENCY.count() - sends == len(telegram.messages)
+    assert metrics.SCHEDULER_LAG.count() - lags == 8
+    assert metrics.QUEUE_DEPTH.value('outbox') == 0
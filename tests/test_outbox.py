@@ -0,0 +1,101 @@
+import asyncio
+import time
+
+from telegram.error import BadRequest, RetryAfter
+
+from homework_bot.outbox import Outbox, TokenBucket
+
+
+class TimedBot:
+    def __init__(self, failures=()):
+        self.failures = list(failures)
+        self.sent = []
+
+    def send_message(self, chat_id, text):
+        if self.failures:
+            raise self.failures.pop(0)
+        self.sent.append((time.monotonic(), chat_id, text))
+
+
+def deliver(outbox, messages):
+    results = []
+
+    async def scenario():
+        outbox.start()
+        for chat_id, text in messages:
+            async def callback(delivered, text=text):
+                results.append((text, delivered))
+            outbox.put(chat_id, text, callback)
+        depth = outbox.depth
+        await outbox.close()
+        return depth
+
+    return asyncio.run(scenario()), results
+
+
+class TestTokenBucket:
+    def test_delay_after_burst(self):
+        bucket = TokenBucket(rate=2, capacity=2, now=0)
+        bucket.consume(now=0)
+        bucket.consume(now=0)
+        assert bucket.delay(now=0) == 0.5
+        assert bucket.delay(now=0.5) == 0
+
+
+class TestOutbox:
+    def test_put_does_not_wait_and_chat_rate_is_respected(self):
+        bot = TimedBot()
+        outbox = Outbox(bot, global_rate=100, chat_rate=20, workers=3)
+        depth, results = deliver(
+            outbox, [('1', 'a'), ('1', 'b'), ('1', 'c'), ('2', 'd')]
+        )
+        assert depth == 4, (
+            'Постановка в очередь не должна ждать отправки сообщений.'
+        )
+        assert sorted(results) == [
+            ('a', True), ('b', True), ('c', True), ('d', True)
+        ]
+        chat_times = [moment for moment, chat, _ in bot.sent if chat == '1']
+        gaps = [later - earlier for earlier, later in zip(
+            chat_times, chat_times[1:]
+        )]
+        assert min(gaps) >= 0.045, (
+            'Сообщения в один чат должны отправляться не чаще лимита.'
+        )
+
+    def test_retry_after_is_honored(self):
+        bot = TimedBot(failures=[RetryAfter(0.1)])
+        outbox = Outbox(bot, chat_rate=100, workers=1)
+        started = time.monotonic()
+        _, results = deliver(outbox, [('1', 'a')])
+        assert results == [('a', True)]
+        assert bot.sent[0][0] - started >= 0.1, (
+            'После ответа 429 отправка должна ждать retry_after секунд.'
+        )
+
+    def test_permanent_error_reported_to_callback(self):
+        bot = TimedBot(failures=[BadRequest('chat not found')])
+        _, results = deliver(Outbox(bot, workers=1), [('1', 'a')])
+        assert results == [('a', False)]
+
+    def test_retry_keeps_chat_order(self):
+        bot = TimedBot(failures=[RetryAfter(0.1)])
+        outbox = Outbox(bot, chat_rate=100, workers=2)
+        _, results = deliver(
+            outbox, [('1', 'reviewing'), ('1', 'approved'), ('2', 'other')]
+        )
+        assert [text for _, chat, text in bot.sent if chat == '1'] == [
+            'reviewing', 'approved'
+        ], 'Повтор не должен пропускать вперёд следующие сообщения чата.'
+        assert sorted(results) == [
+            ('approved', True), ('other', True), ('reviewing', True)
+        ]
+
+    def test_rate_limit_retries_are_capped(self):
+        bot = TimedBot(failures=[RetryAfter(0.01)] * 10)
+        outbox = Outbox(bot, chat_rate=100, workers=1, rate_limit_attempts=3)
+        _, results = deliver(outbox, [('1', 'a')])
+        assert results == [('a', False)], (
+            'Бесконечные ответы 429 не должны задерживать остановку.'
+        )
+        assert len(bot.failures) == 7
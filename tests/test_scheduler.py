@@ -0,0 +1,195 @@
+import random
+from collections import Counter
+
+from homework_bot import metrics
+from homework_bot.scheduler import (
+    AdaptiveScheduler, DueQueue, FixedRateTimer, ScheduleState
+)
+
+HOUR = 60 * 60
+
+
+class TestAdaptiveScheduler:
+    def make(self, **kwargs):
+        params = dict(
+            base=600, reviewing=120, idle_after=6 * HOUR, max_period=HOUR,
+            budget=0, window=24 * HOUR
+        )
+        params.update(kwargs)
+        return AdaptiveScheduler(**params)
+
+    def test_reviewing_is_polled_faster(self):
+        scheduler = self.make()
+        state = ScheduleState(now=0)
+        assert scheduler.next_delay(state, now=0) == 600
+        scheduler.record_status(state, 'reviewing', now=0)
+        assert scheduler.next_delay(state, now=10 * HOUR) == 120, (
+            'Пока работа на ревью, API нужно опрашивать чаще.'
+        )
+
+    def test_backs_off_exponentially_when_idle(self):
+        scheduler = self.make()
+        state = ScheduleState(now=0)
+        scheduler.record_status(state, 'approved', now=0)
+        delays = [
+            scheduler.next_delay(state, now=hours * HOUR)
+            for hours in (1, 6, 12, 48)
+        ]
+        assert delays == [600, 1200, 2400, HOUR], (
+            'При долгом отсутствии изменений интервал должен расти '
+            'экспоненциально до потолка.'
+        )
+
+    def test_budget_spreads_remaining_calls(self):
+        scheduler = self.make(budget=4, window=24 * HOUR)
+        state = ScheduleState(now=0)
+        scheduler.record_call(state, now=0)
+        assert scheduler.next_delay(state, now=0) == 8 * HOUR
+        for _ in range(3):
+            scheduler.record_call(state, now=HOUR)
+        assert scheduler.next_delay(state, now=HOUR) == 23 * HOUR, (
+            'После исчерпания лимита опрос откладывается до конца окна.'
+        )
+        scheduler.record_call(state, now=24 * HOUR)
+        assert state.calls == 1
+
+    def test_slot_alignment_keeps_budget(self):
+        scheduler = self.make(budget=4, window=24 * HOUR, jitter=0)
+        for number in range(200):
+            state = ScheduleState(now=0, phase=(number + 0.5) / 200)
+            calls = []
+            now = scheduler.first_poll_in(state, now=0)
+            while now < 96 * HOUR:
+                scheduler.record_call(state, now=now)
+                calls.append(now)
+                now += scheduler.next_poll_in(state, now=now)
+            busiest = max(
+                sum(start <= moment < start + 24 * HOUR for moment in calls)
+                for start in calls
+            )
+            assert busiest <= 4, (
+                f'Фаза {state.phase}: выравнивание по сетке не должно '
+                'превышать лимит запросов за окно.'
+            )
+
+
+def per_second(times):
+    return Counter(int(moment) for moment in times)
+
+
+class TestPollSpread:
+    TOKENS = [f'token{number}' for number in range(6000)]
+
+    def make(self, **kwargs):
+        params = dict(base=600, reviewing=600, jitter=0.05, seed=1)
+        params.update(kwargs)
+        return AdaptiveScheduler(**params)
+
+    def simulate(self, scheduler, tokens, started, cycles):
+        """Моменты всех опросов, если каждый опрос занимает до 3 секунд."""
+        work = random.Random(2)
+        times = []
+        for token in tokens:
+            state = ScheduleState(now=started, phase=scheduler.phase(token))
+            now = started + scheduler.first_poll_in(state, now=started)
+            for _ in range(cycles):
+                times.append(now)
+                now += work.uniform(0, 3)
+                now += scheduler.next_poll_in(state, now=now)
+        return times
+
+    def test_polls_spread_evenly_over_period(self):
+        scheduler = self.make()
+        started = 1_700_000_000
+        naive = per_second(
+            started + cycle * 600
+            for _ in self.TOKENS for cycle in range(3)
+        )
+        spread = per_second(self.simulate(scheduler, self.TOKENS, started, 3))
+        mean = len(self.TOKENS) / 600
+        assert max(naive.values()) == len(self.TOKENS)
+        assert max(spread.values()) < 3 * mean, (
+            'Опросы студентов должны распределяться по всему периоду, '
+            'а не приходиться на одну секунду.'
+        )
+
+    def test_slot_survives_restart(self):
+        scheduler = self.make(jitter=0)
+        state = ScheduleState(phase=scheduler.phase('token1'))
+        slots = {
+            (now + scheduler.first_poll_in(state, now=now)) % 600
+            for now in (1_700_000_000, 1_700_000_123.5, 1_700_003_333)
+        }
+        assert len(slots) == 1, (
+            'После перезапуска студент должен опрашиваться в свой слот.'
+        )
+
+    def test_zero_period_polls_immediately(self):
+        scheduler = self.make(base=0, reviewing=0)
+        state = ScheduleState(phase=0.7)
+        assert scheduler.first_poll_in(state) == 0
+        assert scheduler.next_poll_in(state) == 0
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0
+
+    def __call__(self):
+        return self.now
+
+
+class TestFixedRateTimer:
+    def test_work_duration_does_not_shift_schedule(self):
+        clock = FakeClock()
+        timer = FixedRateTimer(clock=clock)
+        timer.advance(0)
+        dues = []
+        for work in (5, 50, 599, 0.5):
+            clock.now = timer.due + work
+            timer.advance(600)
+            dues.append(timer.due)
+        assert dues == [600, 1200, 1800, 2400], (
+            'Срок опроса должен отсчитываться от предыдущего срока.'
+        )
+        assert timer.missed == 0
+
+    def test_overrun_skips_missed_ticks(self):
+        clock = FakeClock()
+        timer = FixedRateTimer(clock=clock)
+        timer.advance(0)
+        missed = metrics.MISSED_TICKS.value()
+        clock.now = 1900
+        assert timer.advance(600) == 0
+        assert timer.due == 1800, (
+            'Опоздавший опрос выполняется сразу, не сдвигая сетку сроков.'
+        )
+        assert timer.missed == 2
+        assert metrics.MISSED_TICKS.value() - missed == 2
+        clock.now = 1810
+        assert timer.advance(600) == 590
+
+
+class TestDueQueue:
+    def test_pops_keys_in_due_order(self):
+        queue = DueQueue()
+        for key, due in (('c', 30), ('a', 10), ('b', 20)):
+            queue.schedule(key, due)
+        assert queue.next_due() == 10
+        assert queue.pop_due(25) == ['a', 'b']
+        assert len(queue) == 1
+        assert queue.pop_due(25) == []
+
+    def test_reschedule_replaces_previous_due(self):
+        queue = DueQueue()
+        queue.schedule('a', 10)
+        queue.schedule('b', 20)
+        queue.schedule('a', 40)
+        assert queue.next_due() == 20, (
+            'После переноса срока старая запись не должна будить очередь.'
+        )
+        assert queue.pop_due(100) == ['b', 'a']
+        queue.schedule('a', 5)
+        queue.cancel('a')
+        assert queue.next_due() is None
+        assert not queue
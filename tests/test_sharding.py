@@ -0,0 +1,71 @@
+import pytest
+
+from homework_bot.engine import Tenant, other_shard_tenants
+from homework_bot.sharding import (
+    HashRing, select_tenants, shard_from_env, worker_environ
+)
+
+TENANTS = [Tenant(f'token{number}', str(number)) for number in range(10000)]
+
+
+def owners(count):
+    ring = HashRing(count)
+    return {tenant: ring.owner(tenant.token) for tenant in TENANTS}
+
+
+def test_every_tenant_has_exactly_one_shard():
+    shards = [select_tenants(TENANTS, index, 4) for index in range(4)]
+    assert sum(map(len, shards)) == len(TENANTS)
+    assert set().union(*shards) == set(TENANTS)
+    for shard in shards:
+        assert 0.15 < len(shard) / len(TENANTS) < 0.35
+
+
+@pytest.mark.parametrize('count', [2, 4, 8])
+def test_rebalancing_moves_about_one_nth(count):
+    before, after = owners(count), owners(count + 1)
+    moved = sum(before[tenant] != after[tenant] for tenant in TENANTS)
+    assert moved / len(TENANTS) < 1.5 / (count + 1)
+    assert all(
+        after[tenant] == count
+        for tenant in TENANTS if before[tenant] != after[tenant]
+    )
+
+
+def test_owner_is_deterministic():
+    assert owners(5) == owners(5)
+
+
+@pytest.mark.parametrize('environ, expected', [
+    ({}, (0, 1)),
+    ({'SHARD_COUNT': '3', 'SHARD_INDEX': '2'}, (2, 3)),
+    ({'SHARD_COUNT': '3', 'DYNO': 'engine.2'}, (1, 3)),
+])
+def test_shard_from_env(environ, expected):
+    assert shard_from_env(environ) == expected
+
+
+def test_shard_index_out_of_range():
+    with pytest.raises(ValueError):
+        shard_from_env({'SHARD_COUNT': '2', 'SHARD_INDEX': '2'})
+
+
+def test_worker_metrics_ports_do_not_clash():
+    assert worker_environ(2, 4, {'METRICS_PORT': '9100'})['METRICS_PORT'] == (
+        '9102'
+    )
+
+
+def test_other_shards_served_only_from_shared_store(caplog):
+    everyone = TENANTS[:4]
+    own = everyone[:2]
+    store = object()
+    shared = worker_environ(0, 2, {'STATE_DB': 'state.sqlite3'})
+    assert other_shard_tenants(everyone, own, store, shared) == everyone[2:]
+    for store, environ in (
+        (None, shared), (store, {'STATE_DB': 'state.sqlite3', 'DYNO': 'w.1'})
+    ):
+        assert other_shard_tenants(everyone, own, store, environ) == [], (
+            'Без общей базы чаты других процессов не должны обслуживаться.'
+        )
+    assert 'STATE_DB_SHARED' in caplog.text
@@ -0,0 +1,18 @@
+import subprocess
+import sys
+
+from benchmarks.bench_startup import HEAVY_MODULES, ROOT
+
+
+def test_import_does_not_load_heavy_clients():
+    code = (
+        'import sys, homework; '
+        f'print(*[name for name in {HEAVY_MODULES!r} if name in sys.modules])'
+    )
+    result = subprocess.run(
+        [sys.executable, '-c', code], cwd=ROOT, capture_output=True,
+        text=True, check=True
+    )
+    assert result.stdout.strip() == '', (
+        'Импорт homework не должен загружать клиенты HTTP и Telegram.'
+    )
@@ -0,0 +1,59 @@
+import sqlite3
+
+from homework import build_homework
+from homework_bot.engine import PollingEngine, Tenant
+from homework_bot.storage import StateStore
+
+
+class TestStateStore:
+    def test_state_survives_reopen(self, tmp_path):
+        path = tmp_path / 'state.sqlite3'
+        store = StateStore(path)
+        store.save('token', 100, homeworks=[
+            build_homework(
+                {'id': 1, 'status': 'reviewing', 'homework_name': 'hw'}
+            ),
+            build_homework({'homework_name': 'без id', 'status': 'approved'}),
+        ])
+        store.save('token', 200, 'Сбой', homeworks=[build_homework({
+            'id': 1, 'status': 'approved', 'homework_name': 'hw',
+            'date_updated': 'd',
+        })])
+        store.close()
+
+        store = StateStore(path)
+        assert store.load() == {'token': (200, 'Сбой')}, (
+            'После перезапуска должны загружаться курсор и последняя ошибка.'
+        )
+        assert store.last_statuses('token') == {1: ('approved', 'd')}
+        store.close()
+
+    def test_engine_resumes_from_saved_cursor(self, tmp_path):
+        store = StateStore(tmp_path / 'state.sqlite3')
+        store.save('a', 123)
+        engine = PollingEngine(
+            [Tenant('a', '1'), Tenant('b', '2')], bot=None, http=object(),
+            store=store
+        )
+        assert engine.states[Tenant('a', '1')].timestamp == 123, (
+            'Движок должен продолжать опрос с сохранённого курсора.'
+        )
+        assert engine.states[Tenant('b', '2')].timestamp > 123
+        store.close()
+
+    def test_old_database_is_migrated(self, tmp_path):
+        path = tmp_path / 'state.sqlite3'
+        connection = sqlite3.connect(path)
+        connection.executescript(
+            'CREATE TABLE homework_statuses (token TEXT NOT NULL, '
+            'homework_id INTEGER NOT NULL, status TEXT NOT NULL, '
+            'date_updated TEXT, PRIMARY KEY (token, homework_id)) '
+            'WITHOUT ROWID;'
+        )
+        connection.close()
+        store = StateStore(path)
+        store.save('token', 100, homeworks=[build_homework(
+            {'id': 1, 'status': 'approved', 'homework_name': 'hw'}
+        )])
+        assert store.homeworks('token') == [(1, 'hw', 'approved', None)]
+        store.close()
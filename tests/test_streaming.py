@@ -0,0 +1,108 @@
+import json
+import random
+
+import pytest
+
+import homework
+from homework_bot.streaming import check_homeworks, stream_homeworks
+
+ANSWER = {
+    'current_date': 1700000000,
+    'homeworks': [
+        {'homework_name': f'работа_{number}.zip', 'status': 'approved'}
+        for number in range(5)
+    ],
+    'extra': {'nested': [1, 2, 3]},
+}
+
+
+def chunked(data, size):
+    body = data if isinstance(data, bytes) else json.dumps(
+        data, ensure_ascii=False
+    ).encode()
+    return (body[start:start + size] for start in range(0, len(body), size))
+
+
+class TestStreamHomeworks:
+    @pytest.mark.parametrize('size', [1, 3, 7, 4096])
+    def test_matches_full_decoding(self, size):
+        fields = {}
+        homeworks = list(stream_homeworks(chunked(ANSWER, size), fields))
+        assert homeworks == ANSWER['homeworks'], (
+            'Потоковый разбор должен давать те же работы, что и json.loads.'
+        )
+        assert fields == {
+            'current_date': ANSWER['current_date'], 'extra': ANSWER['extra']
+        }
+        assert [homework.parse_status(item) for item in homeworks]
+
+    def test_items_are_yielded_before_the_end(self):
+        def chunks():
+            yield b'{"homeworks": [{"homework_name": "a", "status": "approved"}'
+            raise AssertionError(
+                'Работа должна отдаваться до чтения остатка ответа.'
+            )
+
+        assert next(stream_homeworks(chunks(), {}))['homework_name'] == 'a'
+
+    def test_number_split_between_chunks(self):
+        fields = {}
+        chunks = [b'{"homeworks": [], "current_date": 1.', b'5}']
+        assert list(stream_homeworks(chunks, fields)) == []
+        assert fields == {'current_date': 1.5}
+
+    def test_random_chunking_matches_json_loads(self):
+        rng = random.Random(7)
+        for _ in range(200):
+            answer = {
+                'current_date': rng.choice(
+                    [rng.randint(-10 ** 6, 10 ** 6), rng.uniform(-1e6, 1e6)]
+                ),
+                'homeworks': [
+                    {'id': rng.randint(0, 10 ** 9), 'ratio': rng.random(),
+                     'flag': rng.choice([True, False, None]),
+                     'exp': rng.uniform(-1, 1) * 10 ** rng.randint(-30, 30)}
+                    for _ in range(rng.randint(0, 4))
+                ],
+            }
+            body = json.dumps(answer).encode()
+            cuts = sorted(rng.sample(
+                range(1, len(body)), rng.randint(0, min(20, len(body) - 1))
+            ))
+            chunks = [
+                body[start:end]
+                for start, end in zip([0] + cuts, cuts + [len(body)])
+            ]
+            fields = {}
+            homeworks = list(stream_homeworks(chunks, fields))
+            expected = json.loads(body)
+            assert homeworks == expected.pop('homeworks')
+            assert fields == expected
+
+    @pytest.mark.parametrize('body, error', [
+        (b'[{"homeworks": []}]', TypeError),
+        (b'{"homeworks": {"a": 1}}', TypeError),
+        (b'{"current_date": 1}', KeyError),
+        (b'{"homeworks": [{"a": 1}', ValueError),
+        (b'{"homeworks": [] "current_date": 1}', ValueError),
+    ])
+    def test_invalid_answers(self, body, error):
+        with pytest.raises(error):
+            list(stream_homeworks(chunked(body, 2), {}))
+
+
+def test_check_homeworks_uses_shared_validator():
+    items = [
+        {'homework_name': f'hw_{number}.zip', 'status': 'approved'}
+        for number in range(5)
+    ]
+    items[3] = {'homework_name': 'bad.zip', 'status': 'unknown'}
+    errors = []
+    records = list(check_homeworks(iter(items), errors, batch_size=2))
+    assert [record.name for record in records] == [
+        'hw_0.zip', 'hw_1.zip', 'hw_2.zip', 'hw_4.zip'
+    ]
+    assert [index for index, _ in errors] == [3], (
+        'Номер ошибки должен считаться от начала ответа, а не пачки.'
+    )
+    assert homework.parse_status(records[0])
@@ -0,0 +1,76 @@
+import pytest
+from telegram.error import NetworkError, RetryAfter, TelegramError
+
+from homework_bot.transport import HttpClient, TelegramSender
+
+
+class FakeResponse:
+    def __init__(self, status_code, data):
+        self.status_code = status_code
+        self.data = data
+
+    def json(self):
+        if isinstance(self.data, Exception):
+            raise self.data
+        return self.data
+
+
+class FakeHttp:
+    def __init__(self, response):
+        self.response = response
+        self.calls = []
+
+    def post(self, url, **kwargs):
+        self.calls.append((url, kwargs))
+        return self.response
+
+
+class TestHttpClient:
+    def test_pool_and_default_timeout(self, monkeypatch):
+        client = HttpClient(pool_size=7, timeout=(1, 2))
+        adapter = client.session.get_adapter('https://example.com')
+        assert adapter._pool_maxsize == 7, (
+            'Размер пула соединений должен задаваться при создании клиента.'
+        )
+        seen = {}
+
+        def fake_get(url, **kwargs):
+            seen.update(kwargs)
+
+        monkeypatch.setattr(client.session, 'get', fake_get)
+        client.get('https://example.com')
+        assert seen['timeout'] == (1, 2), (
+            'Запросы без явного таймаута должны получать таймаут клиента.'
+        )
+        client.close()
+
+
+class TestTelegramSender:
+    def test_send_message_posts_to_bot_api(self):
+        http = FakeHttp(FakeResponse(200, {'ok': True, 'result': {}}))
+        TelegramSender('123:abc', http, api_url='http://tg').send_message(
+            '42', 'text'
+        )
+        url, kwargs = http.calls[0]
+        assert url == 'http://tg/bot123:abc/sendMessage'
+        assert kwargs['json'] == {'chat_id': '42', 'text': 'text'}
+
+    def test_errors_are_telegram_errors(self):
+        sender = TelegramSender('t', FakeHttp(FakeResponse(429, {
+            'ok': False, 'parameters': {'retry_after': 3}
+        })))
+        with pytest.raises(RetryAfter) as error:
+            sender.send_message('1', 'x')
+        assert error.value.retry_after == 3
+        sender = TelegramSender('t', FakeHttp(FakeResponse(400, {
+            'ok': False, 'description': 'Bad Request'
+        })))
+        with pytest.raises(TelegramError):
+            sender.send_message('1', 'x')
+
+    def test_server_errors_are_retried_as_network_errors(self):
+        sender = TelegramSender('t', FakeHttp(FakeResponse(
+            502, ValueError('Expecting value')
+        )))
+        with pytest.raises(NetworkError):
+            sender.send_message('1', 'x')
@@ -0,0 +1,47 @@
+from collections import namedtuple
+
+import pytest
+
+import homework
+from homework import Homework, HomeworkStatus
+from homework_bot import metrics
+from homework_bot.validation import BatchValidator, Field
+
+
+def test_batch_returns_valid_records_and_item_errors():
+    records, errors = homework.HOMEWORK_VALIDATOR.validate([
+        {'id': 1, 'homework_name': 'first.zip', 'status': 'approved'},
+        'not a dict',
+        {'id': 3, 'status': 'approved'},
+        {'id': 4, 'homework_name': 'fourth.zip', 'status': 'lost'},
+        {'id': 5, 'homework_name': 'fifth.zip', 'status': ['approved']},
+        {'id': 6, 'homework_name': 'sixth.zip', 'status': 'rejected',
+         'date_updated': '2024-01-01T00:00:00Z'},
+    ])
+    assert records == [
+        Homework(1, 'first.zip', HomeworkStatus.APPROVED, None),
+        Homework(
+            6, 'sixth.zip', HomeworkStatus.REJECTED, '2024-01-01T00:00:00Z'
+        ),
+    ]
+    assert [
+        (index, type(error)) for index, error in errors
+    ] == [(1, TypeError), (2, KeyError), (3, ValueError), (4, ValueError)]
+
+
+def test_check_response_skips_malformed_items(caplog):
+    before = metrics.VALIDATION_FAILURES.value('homework', 'KeyError')
+    homeworks = homework.check_response({'homeworks': [
+        {'homework_name': 'good.zip', 'status': 'reviewing'},
+        {'homework_name': 'bad.zip'},
+    ]})
+    assert [item.name for item in homeworks] == ['good.zip']
+    assert 'Пропущена домашняя работа №1' in caplog.text
+    after = metrics.VALIDATION_FAILURES.value('homework', 'KeyError')
+    assert after == before + 1
+
+
+def test_schema_must_match_record():
+    Pair = namedtuple('Pair', ('left', 'right'))
+    with pytest.raises(ValueError):
+        BatchValidator(Pair, (Field('left'),))